@@ -245,6 +245,7 @@ class UserPurger(object):
                 **change)
             unit.__class__.objects.filter(id=unit.id).update(
                 translator_comment=translator_comment,
+                content_hash=None,
                 revision=Revision.incr())
         return stores
 
@@ -283,6 +284,7 @@ class UserPurger(object):
                 **updates)
             unit.__class__.objects.filter(id=unit.id).update(
                 revision=Revision.incr(),
+                content_hash=None,
                 **unit_updates)
         return stores
 
@@ -344,6 +346,7 @@ class UserPurger(object):
             # Increment revision
             unit.__class__.objects.filter(id=unit.id).update(
                 revision=Revision.incr(),
+                content_hash=None,
                 **unit_updates)
         return stores
 
@@ -15,6 +15,7 @@ from django.core.management.base import BaseCommand, CommandError
 from xtle.app.runner import set_sync_mode
 from xtle.language.models import Language
 from xtle.project.models import Project
+from xtle.store.models import get_tm_queue
 from xtle.tp.models import TranslationProject
 
 
@@ -155,6 +156,7 @@ class XtleCommand(BaseCommand):
         logger.info('[xtle] Running: %s', self.name)
 
         self.handle_all(**options)
+        get_tm_queue().flush()
 
         # info finish
         end = datetime.datetime.now()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import os
+
+from xtle.checks.utils import TPQCUpdater, get_check_executor
+from xtle.store.models import QualityCheck
+
+from . import XtleCommand
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(XtleCommand):
+    help = "Recalculate the quality checks for translated units."
+    executor = None
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--check",
+            action="append",
+            dest="check_names",
+            help="Check to recalculate")
+        parser.add_argument(
+            "--processes",
+            action="store",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes to calculate checks with")
+        parser.add_argument(
+            "--clear-unknown",
+            action="store_true",
+            default=False,
+            help="Delete checks that are no longer known")
+
+    def handle_all(self, **options):
+        if options["clear_unknown"]:
+            QualityCheck.delete_unknown_checks()
+        if options["processes"] < 2:
+            return super(Command, self).handle_all(**options)
+        # share a single pool of workers between the TPs
+        with get_check_executor(options["processes"]) as executor:
+            self.executor = executor
+            try:
+                super(Command, self).handle_all(**options)
+            finally:
+                self.executor = None
+
+    def handle_translation_project(self, tp, **options):
+        updated = TPQCUpdater(
+            translation_project=tp,
+            check_names=options["check_names"],
+            processes=options["processes"],
+            executor=self.executor).update(update_data_after=True)
+        logger.info(
+            "[xtle] Updated checks for %s stores in %s",
+            len(updated.get(tp.id, [])),
+            tp)
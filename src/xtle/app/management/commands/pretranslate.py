@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from django.contrib.auth import get_user_model
+
+from xtle.core.delegate import review
+from xtle.store.contextmanagers import update_store_after
+from xtle.store.constants import UNTRANSLATED
+from xtle.store.models import Suggestion, Unit, get_tm_broker
+
+from . import XtleCommand
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(XtleCommand):
+    help = (
+        "Add the best TM match for untranslated units as a suggestion.")
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            type=int,
+            default=100,
+            help="Number of units to look up in the TM at once")
+
+    def handle_translation_project(self, tp, **options):
+        return True
+
+    def iter_batches(self, units, batch_size):
+        batch = []
+        for unit in units.iterator():
+            batch.append(unit)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def group_by_store(self, batch):
+        stores = {}
+        for unit in batch:
+            stores.setdefault(unit.store_id, []).append(unit)
+        return stores.values()
+
+    def add_suggestions(self, suggestion_review, units, results, user):
+        added = 0
+        # store data is updated once for all suggestions added to the store
+        with update_store_after(units[0].store):
+            for unit in units:
+                if not results.get(unit.id):
+                    continue
+                added += suggestion_review.add(
+                    unit,
+                    results[unit.id][0]["target"],
+                    user=user)[1]
+        return added
+
+    def handle_all_stores(self, tp, **options):
+        broker = get_tm_broker()
+        system = get_user_model().objects.get_system_user()
+        suggestion_review = review.get(Suggestion)(reviewer=system)
+        # the TM servers are queried from other threads, so anything they
+        # read from the units must be loaded here
+        units = Unit.objects.live().filter(
+            store__translation_project=tp,
+            state=UNTRANSLATED).select_related(
+                "store__translation_project__language").order_by(
+                    "store", "index")
+        added = 0
+        for batch in self.iter_batches(units, options["batch_size"]):
+            results = broker.search_many(batch)
+            for store_units in self.group_by_store(batch):
+                added += self.add_suggestions(
+                    suggestion_review,
+                    store_units,
+                    results,
+                    system)
+        logger.info(
+            "[xtle] Added %s TM suggestions for %s",
+            added,
+            tp)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from xtle.core.delegate import data_tool
+from xtle.store.models import Store
+from xtle.tp.models import TranslationProject
+
+from . import XtleCommand
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(XtleCommand):
+    help = (
+        "Recalculate the stats for stores and translation projects from "
+        "their units.")
+
+    def handle_translation_project(self, tp, **options):
+        return True
+
+    def handle_all_stores(self, tp, **options):
+        stores = Store.objects.live().filter(
+            translation_project=tp).select_related("data")
+        for store in stores.iterator():
+            data_tool.get(Store)(store).update()
+        data_tool.get(TranslationProject)(tp).update()
+        logger.info("[xtle] Refreshed stats for %s", tp)
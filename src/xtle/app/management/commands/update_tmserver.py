@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from django.conf import settings
+
+from xtle.store.constants import TRANSLATED
+from xtle.store.models import Unit, get_tm_broker
+from xtle.store.util import get_tm_document
+
+from . import XtleCommand
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(XtleCommand):
+    help = "Reindex translated units in the local TM server."
+    atomic_default = "none"
+    unit_fields = (
+        "id",
+        "revision",
+        "source_f",
+        "target_f",
+        "store__xtle_path",
+        "change__submitted_on",
+        "change__submitted_by__username",
+        "change__submitted_by__full_name",
+        "change__submitted_by__email")
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            type=int,
+            default=settings.XTLE_TM_UPDATE_BATCH_SIZE,
+            help="Number of units to index in each bulk request")
+
+    def handle_translation_project(self, tp, **options):
+        return True
+
+    def iter_documents(self, tp):
+        units = Unit.objects.live().filter(
+            store__translation_project=tp,
+            state=TRANSLATED).order_by().values_list(*self.unit_fields)
+        project = tp.project.fullname
+        for unit in units.iterator():
+            (unit_id, revision, source, target, path,
+             submitted_on, username, fullname, email) = unit
+            yield get_tm_document(
+                unit_id,
+                revision,
+                project,
+                path,
+                source,
+                target,
+                submitted_on=submitted_on,
+                username=username,
+                fullname=fullname,
+                email=email)
+
+    def handle_all_stores(self, tp, **options):
+        broker = get_tm_broker()
+        batch_size = options["batch_size"]
+        batch = []
+        indexed = 0
+        for doc in self.iter_documents(tp):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                broker.update_many(tp.language.code, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            broker.update_many(tp.language.code, batch)
+            indexed += len(batch)
+        logger.info("[xtle] Indexed %s units in TM for %s", indexed, tp)
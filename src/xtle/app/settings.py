@@ -148,6 +148,16 @@ CACHES = {
 
 XTLE_TRANSLATION_DIRECTORY = 'translations'
 XTLE_FS_WORKING_PATH = os.path.abspath(os.path.join('.xtle_fs', 'tmp'))
+# number of worker threads to parse and write files with during fs sync
+XTLE_FS_SYNC_WORKERS = 1
+# number of worker threads to calculate file digests with
+XTLE_FS_DIGEST_WORKERS = 4
+# fsync files and their directories when writing during fs sync
+XTLE_FS_FSYNC = False
+# number of TM documents to index in a single bulk request
+XTLE_TM_UPDATE_BATCH_SIZE = 500
+# max seconds that updated TM documents wait before being indexed
+XTLE_TM_UPDATE_MAX_DELAY = 5
 
 #
 # Scoring
@@ -183,6 +193,11 @@ HAYSTACK_SIGNAL_PROCESSOR = 'haystack.signals.RealtimeSignalProcessor'
 HAYSTACK_LIMIT_TO_REGISTERED_MODELS = True
 
 XTLE_CACHE_TIMEOUT = 604800
+# seconds to keep config in memory, changes from other processes are only
+# seen after this
+XTLE_CONFIG_CACHE_TIMEOUT = 60
+# seconds to cache the totals of unit searches for, 0 to always count them
+XTLE_UNIT_SEARCH_TOTAL_TIMEOUT = 0
 
 
 DJ_CHANNELS_SITE_TITLE = "XTLE translation and localisation environment"
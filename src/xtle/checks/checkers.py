@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import threading
+
+from translate.filters import checks
+
+from .constants import EXCLUDED_FILTERS
+
+
+logger = logging.getLogger(__name__)
+
+
+def filter_error_handler(functionname, str1, str2, e):
+    logger.error(
+        u"Error in filter %s: %r, %r, %s",
+        functionname,
+        str1,
+        str2, e)
+    return False
+
+
+def build_checker(checkstyle, language_code,
+                  excluded_filters=EXCLUDED_FILTERS):
+    """Returns a checker for a project checkstyle and language
+    """
+    checkerclasses = [
+        checks.projectcheckers.get(
+            checkstyle,
+            checks.StandardChecker)]
+    return checks.TeeChecker(
+        checkerclasses=checkerclasses,
+        excludefilters=list(excluded_filters),
+        errorhandler=filter_error_handler,
+        languagecode=language_code)
+
+
+class CheckerRegistry(object):
+    """Process-level cache of checkers
+
+    Checkers keep state while running filters, so each thread gets its own
+    instances. Checkers are keyed by everything they are built from, so
+    they never need to be invalidated.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def checkers(self):
+        if not hasattr(self.local, "checkers"):
+            self.local.checkers = {}
+        return self.local.checkers
+
+    def get(self, checkstyle, language_code,
+            excluded_filters=EXCLUDED_FILTERS):
+        key = (checkstyle, language_code, tuple(sorted(excluded_filters)))
+        checkers = self.checkers
+        if key not in checkers:
+            checkers[key] = build_checker(
+                checkstyle,
+                language_code,
+                excluded_filters)
+        return checkers[key]
+
+
+checkers = CheckerRegistry()
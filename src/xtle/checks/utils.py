@@ -7,8 +7,12 @@
 # AUTHORS file for copyright and authorship information.
 
 import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from functools import lru_cache
 
+import django
+
 from translate.filters import checks
 from translate.filters.decorators import Category
 from translate.lang import data
@@ -23,6 +27,7 @@ from xtle.store.models import QualityCheck, Unit
 from xtle.store.unit import UnitProxy
 from xtle.tp.models import TranslationProject
 
+from .checkers import checkers
 from .constants import (
     CATEGORY_CODES, CATEGORY_IDS, CATEGORY_NAMES, CHECK_NAMES,
     EXCLUDED_FILTERS)
@@ -136,14 +141,25 @@ class UnitQualityCheck(object):
 
 
 class QualityCheckUpdater(object):
+    processes = 1
+    executor = None
+    parallel_chunk_size = 500
+    parallel_unit_fields = (
+        "id", "source_f", "target_f", "locations", "store__id",
+        "store__translation_project__id",
+        "store__translation_project__language__code",
+        "store__translation_project__project__checkstyle")
 
     def __init__(self, check_names=None, translation_project=None,
-                 stores=None, units=None):
+                 stores=None, units=None, processes=1, executor=None):
         """Refreshes QualityChecks for Units
 
         :param check_names: limit checks to given list of quality check names.
         :param translation_project: an instance of `TranslationProject` to
             restrict the update to.
+        :param processes: number of worker processes to calculate checks
+            for translated units with.
+        :param executor: an existing process pool to use for the workers.
         """
 
         self.check_names = check_names
@@ -151,6 +167,8 @@ class QualityCheckUpdater(object):
         self.stores = stores
         self._units = units
         self._updated_stores = {}
+        self.processes = processes
+        self.executor = executor
 
     @cached_property
     def checks(self):
@@ -277,6 +295,8 @@ class QualityCheckUpdater(object):
     def update_translated(self):
         """Update checks for translated Units
         """
+        if self.processes > 1:
+            return self.update_translated_parallel()
         unit_fields = [
             "id", "source_f", "target_f", "locations", "store__id",
             "store__translation_project__language__code",
@@ -305,6 +325,77 @@ class QualityCheckUpdater(object):
         # clear the cache of the remaining Store
         return updated_count
 
+    def iter_translated_chunks(self):
+        """Yields lists of translated unit values, each from a single TP
+        """
+        tp_key = "store__translation_project__id"
+        translated = (
+            self.units.filter(state__gt=UNTRANSLATED)
+                      .order_by("store__translation_project", "store",
+                                "index"))
+        chunk = []
+        units = translated.values(*self.parallel_unit_fields).iterator()
+        for unit in units:
+            new_chunk = (
+                chunk
+                and (unit[tp_key] != chunk[0][tp_key]
+                     or len(chunk) >= self.parallel_chunk_size))
+            if new_chunk:
+                yield chunk
+                chunk = []
+            chunk.append(unit)
+        if chunk:
+            yield chunk
+
+    def submit_translated_chunk(self, executor, chunk):
+        return executor.submit(
+            calculate_check_failures,
+            chunk[0]["store__translation_project__project__checkstyle"],
+            chunk[0]["store__translation_project__language__code"],
+            self.check_names,
+            chunk)
+
+    def update_checked_units(self, tp, checked):
+        """Update checks for units from check failures calculated by a
+        worker
+        """
+        updated_count = 0
+        for unit_id, store, check_failures in checked:
+            unit_checks = UnitQualityCheck(
+                CheckableUnit(dict(id=unit_id)),
+                None,
+                self.checks.get(unit_id, {}),
+                self.check_names)
+            unit_checks.check_failures = check_failures
+            if unit_checks.update():
+                self.update_store(tp, store)
+                updated_count += 1
+        return updated_count
+
+    def update_translated_parallel(self):
+        """Update checks for translated Units, calculating the check
+        failures in a pool of worker processes
+        """
+        executor = self.executor or get_check_executor(self.processes)
+        pending = {}
+        updated_count = 0
+        try:
+            for chunk in self.iter_translated_chunks():
+                if len(pending) >= self.processes * 2:
+                    done, __ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        updated_count += self.update_checked_units(
+                            pending.pop(future), future.result())
+                future = self.submit_translated_chunk(executor, chunk)
+                pending[future] = chunk[0]["store__translation_project__id"]
+            for future, tp in pending.items():
+                updated_count += self.update_checked_units(
+                    tp, future.result())
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+        return updated_count
+
     def update_store(self, tp, store):
         self._updated_stores[tp] = (
             self._updated_stores.get(tp, set()))
@@ -406,6 +497,38 @@ class StoreQCUpdater(QualityCheckUpdater):
         return updated_count
 
 
+def calculate_check_failures(checkstyle, language_code, check_names, units):
+    """Calculates check failures for a list of Unit values dictionaries
+
+    This runs in worker processes, and does not touch the database.
+
+    :return: a list of ``(unit_id, store_id, check_failures)``
+    """
+    checker = checkers.get(checkstyle, language_code)
+    return [
+        (unit["id"],
+         unit["store__id"],
+         UnitQualityCheck(
+             CheckableUnit(unit),
+             checker,
+             {},
+             check_names).check_failures)
+        for unit
+        in units]
+
+
+def get_check_executor(processes):
+    """Returns a process pool for calculating check failures
+
+    Workers are spawned rather than forked so they dont share the parent's
+    database connections.
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup)
+
+
 def get_category_id(code):
     return CATEGORY_IDS.get(code)
 
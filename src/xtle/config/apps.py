@@ -19,3 +19,4 @@ class XTLEConfigConfig(AppConfig):
 
     def ready(self):
         importlib.import_module("xtle.config.getters")
+        importlib.import_module("xtle.config.receivers")
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.encoding import force_text
+
+
+class ConfigCache(object):
+    """Process-local cache of the config for the site, models and objects
+
+    The config for each is kept as a list of ``(key, value)`` for
+    ``XTLE_CONFIG_CACHE_TIMEOUT`` seconds, or until it is invalidated by
+    changes to it in this process.
+    """
+
+    def __init__(self, timeout=None):
+        self._timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    @property
+    def timeout(self):
+        if self._timeout is None:
+            return settings.XTLE_CONFIG_CACHE_TIMEOUT
+        return self._timeout
+
+    def get_cache_key(self, model=None):
+        if model is None:
+            return (None, None)
+        ct = ContentType.objects.get_for_model(model)
+        if isinstance(model, models.Model):
+            pk = model._get_pk_val()
+            if pk is None:
+                return None
+            return (ct.id, force_text(pk))
+        return (ct.id, None)
+
+    def list_config(self, model, loader):
+        """Returns the config for ``model`` (an instance, class or ``None``
+        for the site) loading it with ``loader`` if it is not cached
+        """
+        key = self.get_cache_key(model)
+        if key is None or not self.timeout:
+            return loader()
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < now:
+            entry = (now + self.timeout, loader())
+            with self.lock:
+                self.entries[key] = entry
+        # values can be mutable, so dont hand out the cached ones
+        return copy.deepcopy(entry[1])
+
+    def invalidate(self, content_type_id=None, object_pk=None):
+        with self.lock:
+            self.entries.pop((content_type_id, object_pk), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+config_cache = ConfigCache()
@@ -9,6 +9,7 @@
 from xtle.core.delegate import config
 from xtle.core.plugin import getter
 
+from .cache import config_cache
 from .exceptions import ConfigurationError
 from .models import Config
 
@@ -33,10 +34,20 @@ def config_getter(**kwargs):
     if key is None:
         return conf
 
+    conf_list = config_cache.list_config(
+        instance or sender,
+        conf.list_config)
     if isinstance(key, (list, tuple)):
-        return conf.list_config(key)
-
-    try:
-        return conf.get_config(key)
-    except Config.MultipleObjectsReturned as e:
-        raise ConfigurationError(e)
+        return [
+            (k, v)
+            for k, v
+            in conf_list
+            if not key or k in key]
+
+    values = [v for k, v in conf_list if k == key]
+    if len(values) > 1:
+        raise ConfigurationError(
+            Config.MultipleObjectsReturned(
+                "get() returned more than one %s -- it returned %s!"
+                % (Config.__name__, len(values))))
+    return values[0] if values else None
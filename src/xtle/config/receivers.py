@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import config_cache
+from .models import Config
+
+
+@receiver(post_save, sender=Config)
+@receiver(post_delete, sender=Config)
+def config_changed_handler(**kwargs):
+    instance = kwargs["instance"]
+    invalidate = partial(
+        config_cache.invalidate,
+        instance.content_type_id,
+        instance.object_pk)
+    invalidate()
+    # other threads may have cached the old config before the commit
+    transaction.on_commit(invalidate)
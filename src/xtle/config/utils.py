@@ -12,6 +12,8 @@ from django.utils.functional import cached_property
 
 from xtle.core.delegate import config
 
+from .cache import config_cache
+
 
 class ConfigDict(object):
     """Assumes keys for __config__ are unique, uses last instance of key
@@ -27,7 +29,10 @@ class ConfigDict(object):
 
     @cached_property
     def conf(self):
-        return OrderedDict(self.__config__.list_config())
+        return OrderedDict(
+            config_cache.list_config(
+                self.context,
+                self.__config__.list_config))
 
     def reload(self):
         if "conf" in self.__dict__:
@@ -62,7 +67,7 @@ class ConfigDict(object):
 class SiteConfig(ConfigDict):
 
     def __init__(self):
-        pass
+        self.context = None
 
     @property
     def __config__(self):
@@ -6,15 +6,13 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-import threading
-import types
 from contextlib import ExitStack, contextmanager
 
-from django.dispatch import Signal, receiver
+from django.dispatch import receiver
 
 from xtle.core.signals import (
-    create, delete, update, update_checks, update_data, update_revisions,
-    update_scores)
+    SignalSuppression, create, delete, suppressed_signals, update,
+    update_checks, update_data, update_revisions, update_scores)
 
 
 @contextmanager
@@ -42,41 +40,18 @@ class BulkUpdated(object):
 
 @contextmanager
 def suppress_signal(signal, suppress=None):
-    lock = threading.Lock()
-    suppressed_thread = threading.current_thread().ident
-
-    _orig_send = signal.send
-    _orig_connect = signal.connect
-    temp_signal = Signal()
-
-    def _should_suppress(*args, **kwargs):
-        sender = args[0] if args else kwargs.get("sender")
-        return (
-            threading.current_thread().ident == suppressed_thread
-            and (not suppress
-                 or not sender
-                 or sender in suppress))
-
-    def suppressed_send(self, *args, **kwargs):
-        return (
-            _orig_send(*args, **kwargs)
-            if not _should_suppress(*args, **kwargs)
-            else temp_signal.send(*args, **kwargs))
-
-    def suppressed_connect(self, func, *args, **kwargs):
-        return (
-            _orig_connect(func, *args, **kwargs)
-            if not _should_suppress(*args, **kwargs)
-            else temp_signal.connect(func, *args, **kwargs))
-    with lock:
-        signal.send = types.MethodType(suppressed_send, signal)
-        signal.connect = types.MethodType(suppressed_connect, signal)
+    """Buffers sends of ``signal`` from ``suppress`` senders (or from any
+    sender) in the current context.
+
+    Receivers connected inside the block only receive the suppressed sends.
+    """
+    token = suppressed_signals.set(
+        suppressed_signals.get()
+        + (SignalSuppression(signal, suppress), ))
     try:
         yield
     finally:
-        with lock:
-            signal.send = _orig_send
-            signal.connect = _orig_connect
+        suppressed_signals.reset(token)
 
 
 @contextmanager
@@ -21,13 +21,13 @@ contributors = Getter()
 crud = Getter()
 display = Getter()
 event_score = Provider()
-event_formatters = Provider()
+event_formatters = Provider(cached=True)
 formats = Getter()
 format_registration = Provider()
-format_classes = Provider()
-format_diffs = Provider()
-format_updaters = Provider()
-format_syncers = Provider()
+format_classes = Provider(cached=True)
+format_diffs = Provider(cached=True)
+format_updaters = Provider(cached=True)
+format_syncers = Provider(cached=True)
 frozen = Getter()
 filetype_tool = Getter()
 grouped_events = Getter()
@@ -56,8 +56,8 @@ stopwords = Getter()
 text_comparison = Getter()
 panels = Provider()
 
-serializers = Provider(providing_args=["instance"])
-deserializers = Provider(providing_args=["instance"])
+serializers = Provider(providing_args=["instance"], cached=True)
+deserializers = Provider(providing_args=["instance"], cached=True)
 subcommands = Provider()
 uniqueid = Getter()
 unitid = Provider()
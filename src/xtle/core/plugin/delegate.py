@@ -14,15 +14,40 @@ from .results import GatheredDict
 
 
 class Provider(Signal):
+    """Gathers results from all of the connected providers
+
+    Providers created with ``cached=True`` keep the results gathered for
+    each sender, which is only suitable if the results depend on nothing
+    but the sender. Gathering with any other arguments is not cached. The
+    cache is cleared whenever providers are connected or disconnected.
+    """
 
     result_class = GatheredDict
 
     def __init__(self, *args, **kwargs):
         self.result_class = kwargs.pop("result_class", self.result_class)
+        self.cached = kwargs.pop("cached", False)
         self._sender_map = {}
+        self._gathered_cache = {}
+        self._cache_generation = 0
         super(Provider, self).__init__(*args, **kwargs)
 
     def gather(self, sender=None, **named):
+        if not self.cached or named:
+            return self._gather(sender, **named)
+        try:
+            return self._gathered_cache[sender]
+        except KeyError:
+            pass
+        generation = self._cache_generation
+        gathered = self._gather(sender)
+        with self.lock:
+            # dont cache if providers changed while gathering
+            if generation == self._cache_generation:
+                self._gathered_cache[sender] = gathered
+        return gathered
+
+    def _gather(self, sender=None, **named):
         gathered = self.result_class(self)
         named["gathered"] = gathered
         no_receivers = (
@@ -45,9 +70,27 @@ class Provider(Signal):
                 break
         return gathered
 
+    def _clear_gathered(self):
+        with self.lock:
+            self._cache_generation += 1
+            self._gathered_cache.clear()
+
     def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
         super(Provider, self).connect(receiver, sender, weak, dispatch_uid)
         self._sender_map[_make_id(sender)] = sender
+        self._clear_gathered()
+
+    def disconnect(self, receiver=None, sender=None, dispatch_uid=None):
+        disconnected = super(Provider, self).disconnect(
+            receiver, sender, dispatch_uid)
+        self._clear_gathered()
+        return disconnected
+
+    def _remove_receiver(self, receiver=None):
+        # called when a weakly referenced provider is garbage collected
+        super(Provider, self)._remove_receiver(receiver)
+        self._gathered_cache.clear()
+        self._cache_generation += 1
 
     def _live_receivers(self, sender):
         """
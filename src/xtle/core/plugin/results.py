@@ -14,15 +14,22 @@ class Gathered(object):
     def __init__(self, provider):
         self.provider = provider
         self.__results__ = []
+        self._results = None
 
     def add_result(self, func, gathered):
         self.__results__.append((func, gathered))
+        self._results = None
+
+    @property
+    def results(self):
+        if self._results is None:
+            self._results = self.collect()
+        return self._results
 
 
 class GatheredDict(Gathered):
 
-    @property
-    def results(self):
+    def collect(self):
         gathered = OrderedDict()
         for func_, result in self.__results__:
             if result:
@@ -61,8 +68,7 @@ class GatheredDict(Gathered):
 
 class GatheredList(Gathered):
 
-    @property
-    def results(self):
+    def collect(self):
         gathered = []
         for func_, result in self.__results__:
             if isinstance(result, (list, tuple)):
@@ -10,7 +10,8 @@ from haystack.query import SearchQuerySet
 
 from .base import SearchBackend
 from .broker import SearchBroker
-from .backends import ElasticSearchBackend
+from .queue import TMUpdateQueue
+from .backends import ElasticSearchBackend, NgramSearchBackend
 
 
 class SearchContext(object):
@@ -31,4 +32,6 @@ class SearchContext(object):
         return {}
 
 
-__all__ = ('SearchBackend', 'SearchBroker', 'ElasticSearchBackend')
+__all__ = (
+    'SearchBackend', 'SearchBroker', 'ElasticSearchBackend',
+    'NgramSearchBackend', 'TMUpdateQueue')
@@ -15,6 +15,7 @@ import Levenshtein
 try:
     from elasticsearch import Elasticsearch
     from elasticsearch.exceptions import ElasticsearchException
+    from elasticsearch.helpers import bulk
 except ImportError:
     Elasticsearch = None
 
@@ -98,26 +99,53 @@ class ElasticSearchBackend(SearchBackend):
         logger.error("Elasticsearch error for server(%s:%s): %s",
                      self._settings.get("HOST"), self._settings.get("PORT"), e)
 
+    def _get_query(self, unit):
+        return {
+            "query": {
+                "match": {
+                    "source": {
+                        "query": unit.source,
+                        "fuzziness": 'AUTO',
+                    }
+                }
+            }
+        }
+
     def search(self, unit):
-        counter = {}
-        res = []
         language = unit.store.translation_project.language.code
         es_res = self._es_call(
             "search",
             index=self._settings['INDEX_NAME'],
             doc_type=language,
-            body={
-                "query": {
-                    "match": {
-                        "source": {
-                            "query": unit.source,
-                            "fuzziness": 'AUTO',
-                        }
-                    }
-                }
-            }
+            body=self._get_query(unit)
         )
-
+        return self._get_results(unit, es_res)
+
+    def search_many(self, units):
+        units = list(units)
+        if not units:
+            return {}
+        body = []
+        for unit in units:
+            body.append(
+                {"index": self._settings['INDEX_NAME'],
+                 "type": unit.store.translation_project.language.code})
+            body.append(self._get_query(unit))
+        es_res = self._es_call("msearch", body=body)
+        if not es_res:
+            return {unit.id: self._get_results(unit, es_res)
+                    for unit in units}
+        results = {}
+        for unit, response in zip(units, es_res['responses']):
+            if "error" in response:
+                self._log_error(response["error"])
+                response = None
+            results[unit.id] = self._get_results(unit, response)
+        return results
+
+    def _get_results(self, unit, es_res):
+        counter = {}
+        res = []
         if es_res is None:
             # ElasticsearchException - eg ConnectionError.
             return []
@@ -172,3 +200,19 @@ class ElasticSearchBackend(SearchBackend):
             body=obj,
             id=obj['id']
         )
+
+    def update_many(self, language, objs):
+        actions = (
+            {"_index": self._settings['INDEX_NAME'],
+             "_type": language,
+             "_id": obj['id'],
+             "_source": obj}
+            for obj
+            in objs)
+        try:
+            __, errors = bulk(self._es, actions, raise_on_error=False)
+        except ElasticsearchException as e:
+            self._log_error(e)
+            return
+        for error in errors:
+            self._log_error(error)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+
+import Levenshtein
+
+from ..base import SearchBackend
+from .elasticsearch import DEFAULT_MIN_SIMILARITY
+
+
+__all__ = ('NgramSearchBackend',)
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_MAX_CANDIDATES = 50
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS units ("
+    " id INTEGER PRIMARY KEY,"
+    " length INTEGER NOT NULL,"
+    " source TEXT NOT NULL,"
+    " doc TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS units_length ON units (length)",
+    "CREATE TABLE IF NOT EXISTS grams ("
+    " gram TEXT NOT NULL,"
+    " unit_id INTEGER NOT NULL,"
+    " PRIMARY KEY (gram, unit_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS grams_unit_id ON grams (unit_id)")
+
+
+def get_ngrams(text, size=DEFAULT_NGRAM_SIZE):
+    """Returns the set of character n-grams for a text
+
+    The text is lowercased and padded so that short texts and the start and
+    end of words are indexed.
+    """
+    text = " %s " % text.lower()
+    return set(
+        text[i:i + size]
+        for i
+        in range(max(len(text) - size + 1, 1)))
+
+
+def bounded_distance(text, other, max_distance):
+    """Returns the edit distance between two texts, or ``None`` if it is
+    more than ``max_distance``
+    """
+    if abs(len(text) - len(other)) > max_distance:
+        return None
+    distance = Levenshtein.distance(text, other)
+    if distance > max_distance:
+        return None
+    return distance
+
+
+class NgramSearchBackend(SearchBackend):
+    """Local TM using an n-gram inverted index for each language
+
+    Indexes are stored in SQLite databases in the configured ``PATH`` and
+    read through a memory map. Candidates for a search are pruned by length
+    and by the number of n-grams they must share with the searched text to
+    be within ``MIN_SIMILARITY``, before being scored by edit distance.
+    """
+
+    def __init__(self, config_name):
+        super(NgramSearchBackend, self).__init__(config_name)
+        self.weight = min(max(self._settings.get('WEIGHT', self.weight),
+                              0.0), 1.0)
+        self.path = self._settings.get('PATH', 'tm')
+        self.ngram_size = self._settings.get('NGRAM_SIZE', DEFAULT_NGRAM_SIZE)
+        self.max_candidates = self._settings.get(
+            'MAX_CANDIDATES', DEFAULT_MAX_CANDIDATES)
+        self.mmap_size = self._settings.get('MMAP_SIZE', DEFAULT_MMAP_SIZE)
+        self.min_similarity = self._settings.get(
+            'MIN_SIMILARITY', DEFAULT_MIN_SIMILARITY)
+        if self.min_similarity <= 0 or self.min_similarity >= 1:
+            self.min_similarity = DEFAULT_MIN_SIMILARITY
+        self.local = threading.local()
+
+    def get_index_path(self, language):
+        return os.path.join(
+            self.path,
+            "%s.%s.sqlite3" % (self._settings['INDEX_NAME'], language))
+
+    def get_connection(self, language):
+        """Returns a connection to the index for ``language``, connections
+        are kept for each thread
+        """
+        connections = getattr(self.local, "connections", None)
+        if connections is None:
+            connections = self.local.connections = {}
+        if language not in connections:
+            os.makedirs(self.path, exist_ok=True)
+            connection = sqlite3.connect(
+                self.get_index_path(language),
+                timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA mmap_size=%d" % int(self.mmap_size))
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connections[language] = connection
+        return connections[language]
+
+    def get_length_bounds(self, length):
+        return (
+            int(math.ceil(length * self.min_similarity)),
+            int(math.floor(length / self.min_similarity)))
+
+    def get_max_distance(self, length):
+        return int(
+            math.floor(
+                (1 - self.min_similarity) * length / self.min_similarity))
+
+    def get_candidates(self, connection, source):
+        """Returns ``(id, source, doc)`` for units that could be within
+        ``min_similarity`` of ``source``
+        """
+        grams = get_ngrams(source, self.ngram_size)
+        min_length, max_length = self.get_length_bounds(len(source))
+        # each edit removes at most ``ngram_size`` of the grams of ``source``
+        min_shared = max(
+            len(grams) - self.get_max_distance(len(source)) * self.ngram_size,
+            1)
+        return connection.execute(
+            "SELECT units.id, units.source, units.doc"
+            " FROM units"
+            " JOIN (SELECT unit_id, COUNT(*) AS shared"
+            "       FROM grams"
+            "       WHERE gram IN (SELECT value FROM json_each(?))"
+            "       GROUP BY unit_id"
+            "       HAVING shared >= ?) AS matched"
+            " ON matched.unit_id = units.id"
+            " WHERE units.length BETWEEN ? AND ?"
+            " ORDER BY matched.shared DESC"
+            " LIMIT ?",
+            (json.dumps(list(grams)),
+             min_shared,
+             min_length,
+             max_length,
+             self.max_candidates))
+
+    def search(self, unit):
+        counter = {}
+        res = []
+        source = str(unit.source)
+        if not source:
+            return res
+        language = unit.store.translation_project.language.code
+        if not os.path.exists(self.get_index_path(language)):
+            return res
+        try:
+            candidates = self.get_candidates(
+                self.get_connection(language),
+                source).fetchall()
+        except sqlite3.Error as e:
+            self._log_error(e)
+            return res
+        scored = []
+        for unit_id, candidate_source, doc in candidates:
+            if unit_id == unit.id:
+                continue
+            max_length = max(len(source), len(candidate_source))
+            distance = bounded_distance(
+                source,
+                candidate_source,
+                int((1 - self.min_similarity) * max_length))
+            if distance is None:
+                continue
+            scored.append((1 - distance / float(max_length), unit_id, doc))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        for similarity, unit_id, doc in scored:
+            body = json.loads(doc)
+            translation_pair = body['source'] + body['target']
+            if translation_pair in counter:
+                counter[translation_pair] += 1
+                continue
+            counter[translation_pair] = 1
+            res.append({
+                'unit_id': str(unit_id),
+                'source': body['source'],
+                'target': body['target'],
+                'project': body['project'],
+                'path': body['path'],
+                'username': body['username'],
+                'fullname': body['fullname'],
+                'email_md5': body['email_md5'],
+                'iso_submitted_on': body.get('iso_submitted_on', None),
+                'display_submitted_on': body.get(
+                    'display_submitted_on', None),
+                'score': similarity * self.weight})
+
+        for item in res:
+            item['count'] = counter[item['source']+item['target']]
+
+        return res
+
+    def update(self, language, obj):
+        self.update_many(language, [obj])
+
+    def update_many(self, language, objs):
+        units = []
+        grams = []
+        for obj in objs:
+            source = str(obj['source'])
+            units.append(
+                (obj['id'],
+                 len(source),
+                 source,
+                 json.dumps(
+                     dict(obj,
+                          source=source,
+                          target=str(obj['target'])))))
+            grams.extend(
+                (gram, obj['id'])
+                for gram
+                in get_ngrams(source, self.ngram_size))
+        if not units:
+            return
+        try:
+            connection = self.get_connection(language)
+            with connection:
+                connection.executemany(
+                    "DELETE FROM grams WHERE unit_id = ?",
+                    [(unit[0], ) for unit in units])
+                connection.executemany(
+                    "INSERT OR REPLACE INTO units (id, length, source, doc)"
+                    " VALUES (?, ?, ?, ?)",
+                    units)
+                connection.executemany(
+                    "INSERT OR IGNORE INTO grams (gram, unit_id)"
+                    " VALUES (?, ?)",
+                    grams)
+        except sqlite3.Error as e:
+            self._log_error(e)
+
+    def _log_error(self, e):
+        logger.error("TM index error for %s: %s", self.path, e)
@@ -46,6 +46,22 @@ class SearchBackend(object):
         """
         raise NotImplementedError
 
+    def search_many(self, units):
+        """Search for TM results for a batch of units.
+
+        Backends may be queried from other threads, so the units should have
+        their store, translation project and language loaded.
+
+        :param units: list of :cls:`~xtle_store.models.Unit`
+        :return: dictionary of ``unit.id: results``
+        """
+        return {unit.id: self.search(unit) for unit in units}
+
     def update(self, language, obj):
         """Add a unit to the backend"""
         pass
+
+    def update_many(self, language, objs):
+        """Add a batch of units to the backend"""
+        for obj in objs:
+            self.update(language, obj)
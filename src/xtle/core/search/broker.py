@@ -8,6 +8,8 @@
 
 import importlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from . import SearchBackend
 
@@ -43,14 +45,11 @@ class SearchBroker(SearchBackend):
                     logging.warning("Search backend '%s'. Cannot import '%s'",
                                     server, _module)
 
-    def search(self, unit):
-        if not self._servers:
-            return []
-
+    def _merge_results(self, server_results):
         results = []
         counter = {}
-        for server in self._servers:
-            for result in self._servers[server].search(unit):
+        for server_result in server_results:
+            for result in server_result:
                 translation_pair = result['source'] + result['target']
                 if translation_pair not in counter:
                     counter[translation_pair] = result['count']
@@ -68,7 +67,45 @@ class SearchBroker(SearchBackend):
 
         return results
 
+    def search(self, unit):
+        if not self._servers:
+            return []
+
+        return self._merge_results(
+            self._servers[server].search(unit)
+            for server in self._servers)
+
+    def _search_many(self, server, units):
+        try:
+            return server.search_many(units)
+        except Exception as e:
+            logging.error("Search backend '%s' failed: %s", server, e)
+            return {}
+
+    def search_many(self, units):
+        units = list(units)
+        if not self._servers or not units:
+            return {unit.id: [] for unit in units}
+
+        # query the servers concurrently, each with the whole batch
+        servers = [self._servers[server] for server in self._servers]
+        with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+            server_results = list(
+                executor.map(
+                    partial(self._search_many, units=units),
+                    servers))
+        return {
+            unit.id: self._merge_results(
+                server_result.get(unit.id, [])
+                for server_result in server_results)
+            for unit in units}
+
     def update(self, language, obj):
         for server in self._servers:
             if self._servers[server].is_auto_updatable:
                 self._servers[server].update(language, obj)
+
+    def update_many(self, language, objs):
+        for server in self._servers:
+            if self._servers[server].is_auto_updatable:
+                self._servers[server].update_many(language, objs)
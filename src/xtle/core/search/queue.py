@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import atexit
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class TMUpdateQueue(object):
+    """Accumulates TM documents per language and indexes them in batches
+
+    Documents are queued when the current transaction is committed, and are
+    sent to the TM servers from a background thread once ``batch_size``
+    documents are pending or ``max_delay`` seconds have passed since the
+    first of them was queued.
+
+    Processes that may exit without running ``atexit`` handlers should
+    call ``flush`` once they have saved their units.
+    """
+
+    def __init__(self, get_broker, batch_size=None, max_delay=None):
+        self.get_broker = get_broker
+        self.batch_size = batch_size or settings.XTLE_TM_UPDATE_BATCH_SIZE
+        self.max_delay = (
+            settings.XTLE_TM_UPDATE_MAX_DELAY
+            if max_delay is None
+            else max_delay)
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.pending_count = 0
+        self.first_queued = None
+        # set while the worker is indexing a batch it has taken
+        self.indexing = False
+        self.worker = None
+        self.pid = None
+        atexit.register(self.flush)
+
+    def add(self, language, obj):
+        """Queue a document once the current transaction is committed"""
+        transaction.on_commit(partial(self.put, language, obj))
+
+    def put(self, language, obj):
+        with self.condition:
+            self.pending.setdefault(language, []).append(obj)
+            self.pending_count += 1
+            # the worker waits without a timeout while nothing is pending
+            wake = (
+                self.first_queued is None
+                or self.pending_count >= self.batch_size)
+            if self.first_queued is None:
+                self.first_queued = time.monotonic()
+            self.ensure_worker()
+            if wake:
+                self.condition.notify_all()
+
+    def ensure_worker(self):
+        # threads dont survive a fork, so start a new worker in the child
+        if self.pid == os.getpid() and self.worker.is_alive():
+            return
+        self.pid = os.getpid()
+        self.worker = threading.Thread(
+            target=self.run,
+            name="tm-update-queue",
+            daemon=True)
+        self.worker.start()
+
+    def get_timeout(self):
+        if self.first_queued is None:
+            return None
+        return max(
+            0,
+            self.first_queued + self.max_delay - time.monotonic())
+
+    def is_due(self):
+        return (
+            self.pending_count >= self.batch_size
+            or (self.first_queued is not None
+                and self.get_timeout() == 0))
+
+    def take(self):
+        pending = self.pending
+        self.pending = {}
+        self.pending_count = 0
+        self.first_queued = None
+        return pending
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.is_due():
+                    self.condition.wait(self.get_timeout())
+                pending = self.take()
+                self.indexing = True
+            try:
+                self.index(pending)
+            finally:
+                with self.condition:
+                    self.indexing = False
+                    self.condition.notify_all()
+
+    def index(self, pending):
+        broker = self.get_broker()
+        for language, objs in pending.items():
+            for i in range(0, len(objs), self.batch_size):
+                try:
+                    broker.update_many(
+                        language,
+                        objs[i:i + self.batch_size])
+                except Exception as e:
+                    logger.error(
+                        "[tm] Failed indexing %s units for %s: %s",
+                        len(objs[i:i + self.batch_size]),
+                        language,
+                        e)
+
+    def flush(self):
+        """Index all pending documents in the calling thread, and wait for
+        any batch the worker is indexing
+        """
+        with self.condition:
+            pending = self.take()
+        if pending:
+            self.index(pending)
+        with self.condition:
+            while self.indexing and self.worker.is_alive():
+                self.condition.wait()
@@ -7,35 +7,93 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from contextvars import ContextVar
+
 from django.dispatch import Signal
 
 
-changed = Signal(
+# stack of signal suppressions active in the current context
+suppressed_signals = ContextVar("suppressed_signals", default=())
+
+
+class SignalSuppression(object):
+    """Redirects sends and connects of a signal to a buffer signal"""
+
+    def __init__(self, signal, suppress=None):
+        self.signal = signal
+        self.suppress = suppress
+        self.buffer = XtleSignal()
+
+    def matches(self, signal, sender=None):
+        return (
+            signal is self.signal
+            and (not self.suppress
+                 or not sender
+                 or sender in self.suppress))
+
+
+class XtleSignal(Signal):
+    """Signal that can be suppressed for the current context.
+
+    While a suppression is active, matching sends and connects go to the
+    suppression's buffer signal instead. Suppressions are held in a
+    contextvar so other threads are not affected.
+    """
+
+    def get_buffer(self, sender=None):
+        for suppression in reversed(suppressed_signals.get()):
+            if suppression.matches(self, sender):
+                return suppression.buffer
+
+    def send(self, sender, **named):
+        buffer = self.get_buffer(sender)
+        if buffer is not None:
+            return buffer.send(sender, **named)
+        return super(XtleSignal, self).send(sender, **named)
+
+    def connect(self, receiver, sender=None, weak=True, dispatch_uid=None):
+        buffer = self.get_buffer(sender)
+        if buffer is not None:
+            return buffer.connect(
+                receiver, sender=sender, weak=weak, dispatch_uid=dispatch_uid)
+        return super(XtleSignal, self).connect(
+            receiver, sender=sender, weak=weak, dispatch_uid=dispatch_uid)
+
+    def disconnect(self, receiver=None, sender=None, dispatch_uid=None):
+        buffer = self.get_buffer(sender)
+        if buffer is not None:
+            return buffer.disconnect(
+                receiver, sender=sender, dispatch_uid=dispatch_uid)
+        return super(XtleSignal, self).disconnect(
+            receiver, sender=sender, dispatch_uid=dispatch_uid)
+
+
+changed = XtleSignal(
     providing_args=["instance", "key", "value", "old_value"],
     use_caching=True)
-config_updated = Signal(
+config_updated = XtleSignal(
     providing_args=["instance", "updates"],
     use_caching=True)
-create = Signal(
+create = XtleSignal(
     providing_args=["instance", "objects"],
     use_caching=True)
-delete = Signal(
+delete = XtleSignal(
     providing_args=["instance", "objects"],
     use_caching=True)
-update = Signal(
+update = XtleSignal(
     providing_args=["instance", "objects"],
     use_caching=True)
-update_checks = Signal(
+update_checks = XtleSignal(
     providing_args=["instance", "keep_false_positives"],
     use_caching=True)
-update_data = Signal(providing_args=["instance"], use_caching=True)
-update_revisions = Signal(providing_args=["instance"], use_caching=True)
-filetypes_changed = Signal(
+update_data = XtleSignal(providing_args=["instance"], use_caching=True)
+update_revisions = XtleSignal(providing_args=["instance"], use_caching=True)
+filetypes_changed = XtleSignal(
     providing_args=["instance", "filetype"],
     use_caching=True)
-update_scores = Signal(
+update_scores = XtleSignal(
     providing_args=["instance", "users"],
     use_caching=True)
-toggle = Signal(
+toggle = XtleSignal(
     providing_args=["instance", "false_positive"],
     use_caching=True)
@@ -17,6 +17,7 @@ from xtle.store.models import Store
 from xtle.tp.models import TranslationProject
 
 from .models import StoreChecksData, StoreData, TPChecksData, TPData
+from .scheduler import data_refresh
 
 
 logger = logging.getLogger(__name__)
@@ -74,14 +75,17 @@ def handle_tp_checks_data_create(**kwargs):
 
 @receiver(post_save, sender=StoreData)
 def handle_storedata_save(**kwargs):
-    tp = kwargs["instance"].store.translation_project
-    update_data.send(tp.__class__, instance=tp)
+    data_refresh.schedule([kwargs["instance"].store], revisions=False)
 
 
 @receiver(update_data, sender=Store)
 def handle_store_data_update(**kwargs):
     store = kwargs.get("instance")
-    data_tool.get(Store)(store).update()
+    data_tool.get(Store)(store).update(
+        **{k: kwargs[k]
+           for k
+           in ("deltas", "fields", "max_unit_revision", "max_unit_mtime")
+           if k in kwargs})
 
 
 @receiver(update_data, sender=TranslationProject)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import threading
+
+from django.db import transaction
+
+from xtle.core.signals import update_data, update_revisions
+from xtle.app.models import Directory
+
+
+logger = logging.getLogger(__name__)
+
+
+class DirtySet(object):
+    """Translation projects and paths that need their data refreshed"""
+
+    def __init__(self):
+        self.tps = {}
+        self.paths = {}
+        self.flushed = False
+
+    def __bool__(self):
+        return bool(self.tps or self.paths)
+
+    def add(self, stores, data=True, revisions=True):
+        for store in stores:
+            tp_id = store.translation_project_id
+            if data and tp_id not in self.tps:
+                self.tps[tp_id] = store.translation_project
+            if revisions:
+                self.paths.setdefault(tp_id, set()).add(store.xtle_path)
+
+    def flush(self):
+        self.flushed = True
+        for tp in self.tps.values():
+            update_data.send(
+                tp.__class__,
+                instance=tp)
+        for paths in self.paths.values():
+            update_revisions.send(
+                Directory,
+                paths=paths,
+                keys=["stats", "checks"])
+        logger.debug(
+            "[data] Refreshed data for %s TPs, revisions for %s TPs",
+            len(self.tps),
+            len(self.paths))
+
+
+class DataRefreshScheduler(object):
+    """Defers TP data and revision updates for changed stores until the
+    current transaction is committed.
+
+    Each TP is refreshed once per transaction however many of its stores
+    changed. Outside of a transaction updates are flushed immediately.
+    """
+
+    dirty_set_class = DirtySet
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def is_pending(self, dirty, connection):
+        return (
+            not dirty.flushed
+            and any(entry[1] == dirty.flush
+                    for entry
+                    in connection.run_on_commit))
+
+    def get_dirty_set(self, using=None):
+        connection = transaction.get_connection(using)
+        dirty = getattr(self.local, "dirty", None)
+        if dirty is None or not self.is_pending(dirty, connection):
+            # the last set was flushed or rolled back
+            dirty = self.local.dirty = self.dirty_set_class()
+            transaction.on_commit(dirty.flush, using=using)
+        return dirty
+
+    def schedule(self, stores, data=True, revisions=True, using=None):
+        if not transaction.get_connection(using).in_atomic_block:
+            dirty = self.dirty_set_class()
+            dirty.add(stores, data=data, revisions=revisions)
+            dirty.flush()
+            return
+        self.get_dirty_set(using).add(
+            stores, data=data, revisions=revisions)
+
+
+data_refresh = DataRefreshScheduler()
@@ -8,16 +8,17 @@
 
 from translate.filters.decorators import Category
 
-from django.db import models
-from django.db.models import Case, Count, Max, Q, When
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Q, When
+from django.db.models.functions import Coalesce, Greatest
 
 from xtle.core.bulk import BulkCRUD
-from xtle.core.signals import update_data, update_revisions
 from xtle.statistics.models import Submission
 from xtle.store.constants import FUZZY, OBSOLETE, TRANSLATED
 from xtle.store.models import QualityCheck
 
 from .models import StoreChecksData, StoreData
+from .scheduler import data_refresh
 from .utils import DataTool, DataUpdater
 
 
@@ -25,23 +26,12 @@ class StoreDataCRUD(BulkCRUD):
     model = StoreData
 
     def update_tps_and_revisions(self, stores):
-        tps = {}
-        for store in stores:
-            if store.translation_project_id not in tps:
-                tps[store.translation_project_id] = store.translation_project
-            update_revisions.send(
-                store.__class__,
-                instance=store,
-                keys=["stats", "checks"])
-        for tp in tps.values():
-            update_data.send(
-                tp.__class__,
-                instance=tp)
+        data_refresh.schedule(stores)
 
     def post_create(self, instance=None, objects=None, pre=None, result=None):
         if objects:
             self.update_tps_and_revisions(
-                set(result.store for data in objects))
+                set(data.store for data in objects))
 
     def post_update(self, instance=None, objects=None, pre=None, result=None):
         if objects:
@@ -166,6 +156,62 @@ class StoreDataUpdater(DataUpdater):
             self.units.filter(suggestion__state__name="pending")
                       .values_list("suggestion").count())
 
+    def can_apply_deltas(self):
+        return bool(
+            self.data.pk
+            and not self.store.obsolete)
+
+    @transaction.atomic
+    def apply_deltas(self, deltas, maxima=None):
+        """Applies word count deltas and unit maxima to the store data, and
+        schedules a refresh of the TP data
+        """
+        updates = {
+            k: F(k) + v
+            for k, v
+            in deltas.items()
+            if v}
+        updates.update(
+            (k, Greatest(Coalesce(F(k), v), v))
+            for k, v
+            in (maxima or {}).items())
+        if not updates:
+            return
+        StoreData.objects.filter(pk=self.data.pk).update(**updates)
+        # the TP data is re-aggregated from the store data
+        data_refresh.schedule([self.store], revisions=False)
+        self.data.refresh_from_db(fields=list(updates.keys()))
+
+    def update(self, **kwargs):
+        """Updates the store data.
+
+        If `deltas` for the word counts are provided these are applied
+        directly and the word counts are not re-aggregated. Senders of
+        `deltas` can also provide the `max_unit_revision` and
+        `max_unit_mtime` of the units they changed, and the other `fields`
+        their changes affect, and only those are re-aggregated.
+        """
+        deltas = kwargs.pop("deltas", None)
+        maxima = {
+            k: kwargs.pop(k)
+            for k
+            in ("max_unit_revision", "max_unit_mtime")
+            if k in kwargs}
+        maxima = {k: v for k, v in maxima.items() if v is not None}
+        if deltas is None:
+            return super(StoreDataUpdater, self).update(**kwargs)
+        if not self.can_apply_deltas():
+            # the fields were sent along with the deltas
+            kwargs.pop("fields", None)
+            return super(StoreDataUpdater, self).update(**kwargs)
+        self.apply_deltas(deltas, maxima)
+        kwargs["fields"] = [
+            field
+            for field
+            in self.filter_fields(**kwargs)
+            if field not in deltas and field not in maxima]
+        return super(StoreDataUpdater, self).update(**kwargs)
+
     def get_store_data(self, **kwargs):
         if self.store.obsolete:
             kwargs["fields"] = (
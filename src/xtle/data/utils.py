@@ -17,6 +17,7 @@ from xtle.core.url_helpers import split_xtle_path
 from xtle.statistics.models import Submission
 from xtle.statistics.proxy import SubmissionProxy
 from xtle.store.models import Unit
+from xtle.store.util import WORDCOUNT_FIELDS
 
 from .apps import XTLEDataConfig
 from .models import StoreChecksData, StoreData, TPChecksData, TPData
@@ -128,13 +129,22 @@ class DataUpdater(object):
         for f in ["max_unit_revision", "max_unit_mtime"]:
             if f not in fields_to_get:
                 aggregate_fields.remove(f)
+        skip_words = (
+            "words" in aggregate_fields
+            and not set(WORDCOUNT_FIELDS) & set(fields_to_get))
+        if skip_words:
+            aggregate_fields.remove("words")
         return aggregate_fields
 
     def filter_fields(self, **kwargs):
         if "fields" in kwargs:
-            return list(
-                set(kwargs["fields"])
-                & set(self.update_fields))
+            # keep the order of update_fields, as critical_checks are
+            # counted from the checks
+            return [
+                field
+                for field
+                in self.update_fields
+                if field in kwargs["fields"]]
         return self.update_fields
 
     def get_aggregate_data(self, fields):
@@ -27,6 +27,7 @@ class LangStoreSyncer(StoreSyncer):
 
 
 class DiffableLangStore(DiffableStore):
+    unit_fields = DiffableStore.unit_fields + ("target_f", )
 
     def get_unit_state(self, file_unit):
         return (
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from xtle.core.cache import get_cache
+
+from .apps import XTLEFSConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_digest(file_path, chunk_size=65536):
+    """Returns the sha1 hex digest of a file's content"""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(partial(f.read, chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileDigests(object):
+    """Content digests of the files in a project's FS working directory
+
+    Digests are cached persistently for each path together with the size,
+    mtime and inode of the file, and are only recalculated if any of these
+    change. So files that are touched without their content changing keep
+    the same digest.
+    """
+
+    ns = "xtle.fs.digests"
+    sw_version = XTLEFSConfig.version
+    # dont bother with a pool for fewer files than this
+    parallel_threshold = 20
+
+    def __init__(self, project, workers=None):
+        self.project = project
+        self.workers = workers or settings.XTLE_FS_DIGEST_WORKERS
+
+    @cached_property
+    def cache(self):
+        return get_cache("redis")
+
+    def get_cache_key(self, path):
+        return (
+            "%s.%s.%s.%s"
+            % (self.ns,
+               self.sw_version,
+               self.project.code,
+               hashlib.md5(path.encode("utf-8")).hexdigest()))
+
+    def get_file_path(self, path):
+        return os.path.join(
+            self.project.local_fs_path,
+            path.strip("/"))
+
+    def get_stat(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def calculate(self, file_paths):
+        """Calculates digests for a list of file paths, in parallel if there
+        are enough of them
+        """
+        if self.workers < 2 or len(file_paths) < self.parallel_threshold:
+            return [calculate_digest(file_path) for file_path in file_paths]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(calculate_digest, file_paths))
+
+    def get_digests(self, paths):
+        """Returns a dictionary of ``path: digest`` for ``paths``
+
+        Missing files have a digest of ``None``.
+        """
+        keys = {path: self.get_cache_key(path) for path in paths}
+        cached = self.cache.get_many(list(keys.values()))
+        digests = {}
+        to_calculate = []
+        to_delete = []
+        for path, key in keys.items():
+            file_path = self.get_file_path(path)
+            stat = self.get_stat(file_path)
+            if stat is None:
+                digests[path] = None
+                if key in cached:
+                    to_delete.append(key)
+                continue
+            if key in cached and tuple(cached[key][:3]) == stat:
+                digests[path] = cached[key][3]
+                continue
+            to_calculate.append((path, file_path, stat))
+        if to_calculate:
+            logger.debug(
+                "[fs] Calculating digests for %s files in %s",
+                len(to_calculate),
+                self.project.code)
+            calculated = self.calculate(
+                [file_path for __, file_path, __ in to_calculate])
+            to_cache = {}
+            for (path, file_path_, stat), digest in zip(to_calculate,
+                                                        calculated):
+                digests[path] = digest
+                to_cache[keys[path]] = stat + (digest, )
+            self.cache.set_many(to_cache, timeout=None)
+        if to_delete:
+            self.cache.delete_many(to_delete)
+        return digests
+
+    def get_digest(self, path):
+        return self.get_digests([path])[path]
@@ -8,9 +8,13 @@
 
 import logging
 import os
+import stat
+import tempfile
+from io import BytesIO
 
 from translate.storage.factory import getclass
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils.functional import cached_property
 
@@ -20,13 +24,27 @@ from xtle.statistics.models import SubmissionTypes
 from xtle.store.constants import XTLE_WINS, SOURCE_WINS
 from xtle.store.models import Store
 
+from .utils import fsync_directory
+
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
 
+def get_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# setting the umask isnt thread safe, so it is read once on import
+DEFAULT_FILE_MODE = 0o666 & ~get_umask()
+
+
 class FSFile(object):
+    # set to an FSyncBatch to defer directory fsyncs
+    fsync_batch = None
 
     def __init__(self, store_fs):
         """
@@ -63,6 +81,18 @@ class FSFile(object):
     def file_exists(self):
         return os.path.exists(self.file_path)
 
+    @property
+    def file_mode(self):
+        """Permissions for (re)written files, temporary files are created
+        private
+
+        Existing files keep their mode, new files get the default for the
+        umask.
+        """
+        if self.file_exists:
+            return stat.S_IMODE(os.stat(self.file_path).st_mode)
+        return DEFAULT_FILE_MODE
+
     @property
     def store_exists(self):
         return self.store is not None
@@ -81,8 +111,7 @@ class FSFile(object):
 
     @property
     def latest_hash(self):
-        if self.file_exists:
-            return str(os.stat(self.file_path).st_mtime)
+        return self.plugin.file_digests.get_digest(self.path)
 
     @property
     def latest_author(self):
@@ -154,35 +183,74 @@ class FSFile(object):
             except User.DoesNotExist:
                 return self.plugin.xtle_user
 
-    def pull(self, user=None, merge=False, xtle_wins=None):
+    def prepare_pull(self):
         """
-        Pull FS file into Xtle
+        Create or resurrect the ``Store`` for a pull if required
+
+        :returns: ``False`` if there is nothing to pull
         """
         if self.store_exists and not self.fs_changed:
-            return
-        logger.debug("Pulling file: %s", self.path)
+            return False
         if not self.store_exists:
             self.create_store()
         if self.store.obsolete:
             self.store.resurrect()
+        return True
+
+    def pull(self, user=None, merge=False, xtle_wins=None, store_file=None):
+        """
+        Pull FS file into Xtle
+
+        :param store_file: the FS file if it has already been parsed
+        """
+        if not self.prepare_pull():
+            return
+        logger.debug("Pulling file: %s", self.path)
         return self._sync_to_xtle(
-            merge=merge, xtle_wins=xtle_wins)
+            merge=merge, xtle_wins=xtle_wins, store_file=store_file)
 
-    def push(self, user=None):
+    def prepare_push(self):
         """
-        Push Xtle ``Store`` into FS
+        Create the directory for a push if required
+
+        :returns: ``False`` if there is nothing to push
         """
         dont_push = (
             not self.store_exists
             or (self.file_exists and not self.xtle_changed))
         if dont_push:
-            return
-        logger.debug("Pushing file: %s", self.path)
+            return False
         directory = os.path.dirname(self.file_path)
         if not os.path.exists(directory):
             logger.debug("Creating directory: %s", directory)
             os.makedirs(directory)
-        return self._sync_from_xtle()
+        return True
+
+    def push(self, user=None, store_file=None, write=None):
+        """
+        Push Xtle ``Store`` into FS
+
+        :param store_file: the FS file if it has already been parsed
+        :param write: callable to write the synced file with, defaults to
+            ``self.write``
+        """
+        if not self.prepare_push():
+            return
+        if not self.file_exists:
+            return self.export()
+        logger.debug("Pushing file: %s", self.path)
+        return self._sync_from_xtle(store_file=store_file, write=write)
+
+    def export(self):
+        """
+        Write the serialized ``Store`` to a new FS file
+
+        As there is no file to sync with, the ``Store`` is serialized once
+        and written directly.
+        """
+        self.write_data(self.store.serialize())
+        logger.debug("Exported file: %s", self.path)
+        return self.store.data.max_unit_revision
 
     def read(self):
         if not self.file_exists:
@@ -194,43 +262,102 @@ class FSFile(object):
         if self.file_exists:
             os.unlink(self.file_path)
 
-    def deserialize(self, create=False):
+    @property
+    def file_class(self):
+        return (
+            self.store.syncer.file_class
+            if self.store
+            else None)
+
+    def parse(self, file_class=None):
+        """
+        Parse the FS file
+
+        This does not touch the database, so it can be run in a worker.
+
+        :returns: the parsed file, or ``None`` if it has no units
+        """
+        if not self.file_exists:
+            return
+        with open(self.file_path, 'rb') as f:
+            f = AttributeProxy(f)
+            f.location_root = self.store_fs.project.local_fs_path
+            store_file = (
+                file_class(f)
+                if file_class
+                else getclass(f)(f.read()))
+        if store_file.units:
+            return store_file
+
+    def deserialize(self, create=False, store_file=None):
         if not create and not self.file_exists:
             return
-        if self.file_exists:
-            with open(self.file_path, 'rb') as f:
-                f = AttributeProxy(f)
-                f.location_root = self.store_fs.project.local_fs_path
-                store_file = (
-                    self.store.syncer.file_class(f)
-                    if self.store and self.store.syncer.file_class
-                    else getclass(f)(f.read()))
-            if store_file.units:
-                return store_file
+        if store_file is None:
+            store_file = self.parse(self.file_class)
+        if store_file is not None:
+            return store_file
         if self.store_exists:
             return self.store.deserialize(self.store.serialize())
 
+    def write_data(self, data):
+        """
+        Write serialized data to FS
+
+        The data is written to a temporary file which then replaces the FS
+        file, so the FS file is never left partially written.
+        """
+        directory = os.path.dirname(self.file_path)
+        with tempfile.NamedTemporaryFile(
+                dir=directory,
+                prefix=".%s." % os.path.basename(self.file_path),
+                delete=False) as f:
+            try:
+                f.write(data)
+                if settings.XTLE_FS_FSYNC:
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        os.chmod(f.name, self.file_mode)
+        os.replace(f.name, self.file_path)
+        if not settings.XTLE_FS_FSYNC:
+            return
+        if self.fsync_batch is not None:
+            self.fsync_batch.add(directory)
+        else:
+            fsync_directory(directory)
+
+    def write(self, disk_store):
+        """
+        Write a serialized file to FS
+
+        This does not touch the database, so it can be run in a worker.
+        """
+        out = BytesIO()
+        disk_store.serialize(out)
+        self.write_data(out.getvalue())
+        logger.debug("Pushed file: %s", self.path)
+
     def serialize(self):
         if not self.store_exists:
             return
         return self.store.serialize()
 
-    def _sync_from_xtle(self):
+    def _sync_from_xtle(self, store_file=None, write=None):
         """
         Update FS file with the serialized content from Xtle ```Store```
         """
-        disk_store = self.deserialize(create=True)
+        disk_store = self.deserialize(create=True, store_file=store_file)
         self.store.syncer.sync(disk_store, self.store.data.max_unit_revision)
-        with open(self.file_path, "wb") as f:
-            disk_store.serialize(f)
-        logger.debug("Pushed file: %s", self.path)
+        (write or self.write)(disk_store)
         return self.store.data.max_unit_revision
 
-    def _sync_to_xtle(self, merge=False, xtle_wins=None):
+    def _sync_to_xtle(self, merge=False, xtle_wins=None, store_file=None):
         """
         Update Xtle ``Store`` with the parsed FS file.
         """
-        tmp_store = self.deserialize()
+        tmp_store = self.deserialize(store_file=store_file)
         if not tmp_store:
             logger.warn("File staged for sync has disappeared: %s", self.path)
             return
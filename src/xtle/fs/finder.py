@@ -9,6 +9,8 @@
 import fnmatch
 import os
 import re
+import threading
+import time
 from functools import lru_cache
 
 import scandir
@@ -30,10 +32,62 @@ PATH_MAPPING = (
 
 DEFAULT_EXTENSIONS = ("po", "pot")
 
+SEGMENT_MAPPING = {
+    "<language_code>": r"(?P<language_code>[\w\@\-\.]*)",
+    "<filename>": r"[\w\-\.]*"}
+
+
+class DirectoryListings(object):
+    """Process-level cache of directory listings
+
+    Listings are keyed by the directory mtime, which changes when entries
+    are added to or removed from the directory. Directories modified very
+    recently are not cached, as further changes might not change the mtime.
+    """
+
+    racy_window = 2 * 10 ** 9
+
+    def __init__(self):
+        self.listings = {}
+        self.lock = threading.Lock()
+
+    def scan(self, directory):
+        dirs = []
+        files = []
+        for entry in scandir.scandir(directory):
+            if not entry.is_dir():
+                files.append(entry.name)
+            elif not entry.is_symlink():
+                dirs.append(entry.name)
+        return dirs, files
+
+    def get(self, directory):
+        """Returns ``(dirs, files)`` for a directory, or ``None`` if it
+        doesnt exist
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            with self.lock:
+                self.listings.pop(directory, None)
+            return
+        cached = self.listings.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1:]
+        dirs, files = self.scan(directory)
+        if time.time_ns() - mtime > self.racy_window:
+            with self.lock:
+                self.listings[directory] = (mtime, dirs, files)
+        return dirs, files
+
+
+directory_listings = DirectoryListings()
+
 
 class TranslationFileFinder(object):
     ns = "xtle.fs.finder"
     sw_version = XTLEFSConfig.version
+    listings = directory_listings
     extensions = DEFAULT_EXTENSIONS
     path_mapping = PATH_MAPPING
 
@@ -77,11 +131,71 @@ class TranslationFileFinder(object):
                 os.path.basename(file_path))[0]
         return file_path, matched
 
+    @cached_property
+    def dir_segments(self):
+        """Directory segments of the translation mapping below file_root
+        """
+        return self.translation_mapping[
+            len(self.file_root):].strip("/").split("/")[:-1]
+
+    @cached_property
+    def dir_patterns(self):
+        """Regexes for the directory segments of the translation mapping,
+        up to the first <dir_path>
+        """
+        patterns = []
+        for segment in self.dir_segments:
+            if "<dir_path>" in segment:
+                break
+            pattern = "".join(
+                SEGMENT_MAPPING.get(part, re.escape(part))
+                for part
+                in re.split(r"(<\w+>)", segment))
+            patterns.append(re.compile(pattern))
+        return patterns
+
+    @cached_property
+    def max_depth(self):
+        """Maximum depth of directories that can contain matches, or
+        ``None`` if the translation mapping has a <dir_path>
+        """
+        # <dir_path> can match slashes even in the filename segment
+        if "<dir_path>" in self.translation_mapping:
+            return
+        return len(self.dir_segments)
+
+    def can_match_dir(self, depth, name):
+        """Whether a directory at ``depth`` below file_root can contain
+        matching files
+        """
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        if depth >= len(self.dir_patterns):
+            return True
+        match = self.dir_patterns[depth].fullmatch(name)
+        return bool(
+            match
+            and (match.groupdict().get("language_code")
+                 not in self.exclude_languages))
+
     def walk(self):
-        """Walk a filesystem"""
-        for root, dirs_, files in scandir.walk(self.file_root):
+        """Walk the directories under file_root that can contain matching
+        files
+        """
+        to_walk = [(self.file_root, 0)]
+        while to_walk:
+            directory, depth = to_walk.pop()
+            listing = self.listings.get(directory)
+            if listing is None:
+                continue
+            dirs, files = listing
             for filename in files:
-                yield os.path.join(root, filename)
+                yield os.path.join(directory, filename)
+            to_walk.extend(
+                (os.path.join(directory, name), depth + 1)
+                for name
+                in reversed(dirs)
+                if self.can_match_dir(depth, name))
 
     def find(self):
         """Find matching files anywhere in file_root"""
@@ -15,6 +15,7 @@ from xtle.fs.display import ResponseDisplay
 from xtle.fs.exceptions import FSStateError
 from xtle.fs.utils import FSPlugin
 from xtle.project.models import Project
+from xtle.store.models import get_tm_queue
 
 RESPONSE_COLORMAP = dict(
     xtle_added=(None, "MISSING"),
@@ -83,6 +84,9 @@ class FSAPISubCommand(ProjectSubCommand):
             return api_method(**self.handle_api_options(options))
         except FSStateError as e:
             raise CommandError(e)
+        finally:
+            # index units imported from the filesystem before exiting
+            get_tm_queue().flush()
 
     def display(self, **options):
         return ResponseDisplay(
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPipeline(object):
+    """Parses and writes FS files for a sync in a pool of worker threads
+
+    Only ``FSFile.parse`` and ``FSFile.write`` run in the workers, all
+    database access stays in the calling thread. The number of files in
+    flight is bounded so that parsed files dont pile up in memory.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.writes = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def max_pending(self):
+        return self.workers * 2
+
+    def submit_parse(self, fs_file, prepare):
+        if not prepare(fs_file):
+            return
+        return self.executor.submit(fs_file.parse, fs_file.file_class)
+
+    def parse(self, stores_fs, prepare):
+        """Parse the files for ``stores_fs`` in the workers
+
+        ``prepare`` is called in this thread for each file before it is
+        parsed. Files for which it returns ``False`` are not parsed.
+
+        :yields: ``(store_fs, store_file)`` in the order of ``stores_fs``
+        """
+        pending = deque()
+        for store_fs in stores_fs:
+            pending.append(
+                (store_fs, self.submit_parse(store_fs.file, prepare)))
+            if len(pending) >= self.max_pending:
+                yield self.get_parsed(*pending.popleft())
+        while pending:
+            yield self.get_parsed(*pending.popleft())
+
+    def get_parsed(self, store_fs, future):
+        return (
+            store_fs,
+            future.result() if future is not None else None)
+
+    def write(self, fs_file, disk_store):
+        """Write a synced file in the workers"""
+        if len(self.writes) >= self.max_pending:
+            self.writes.popleft().result()
+        self.writes.append(self.executor.submit(fs_file.write, disk_store))
+
+    def close(self):
+        try:
+            while self.writes:
+                self.writes.popleft().result()
+        finally:
+            self.executor.shutdown()
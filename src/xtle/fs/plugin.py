@@ -10,7 +10,8 @@ import logging
 import os
 import shutil
 import uuid
-from functools import lru_cache
+from functools import lru_cache, partial
+from operator import methodcaller
 
 from bulk_update.helper import bulk_update
 
@@ -20,7 +21,8 @@ from django.db import transaction
 from django.utils.functional import cached_property
 
 from xtle.core.delegate import (
-    config, response as xtle_response, revision, state as xtle_state)
+    config, response as xtle_response, revision, state as xtle_state,
+    versioned)
 from xtle.app.models import Directory
 from xtle.project.models import Project
 from xtle.store.constants import XTLE_WINS, SOURCE_WINS
@@ -28,10 +30,13 @@ from xtle.store.models import Store
 
 from .apps import XTLEFSConfig
 from .decorators import emits_state, responds_to_state
+from .digests import FileDigests
 from .delegate import fs_finder, fs_matcher, fs_resources
 from .exceptions import FSStateError
 from .models import StoreFS
+from .pipeline import SyncPipeline
 from .signals import fs_post_pull, fs_post_push, fs_pre_pull, fs_pre_push
+from .utils import FSyncBatch
 
 
 logger = logging.getLogger(__name__)
@@ -141,6 +146,35 @@ class Plugin(object):
                     "Misconfigured xtle_fs user: %s",
                     username)
 
+    @property
+    def sync_workers(self):
+        workers = config.get(
+            self.project.__class__,
+            instance=self.project,
+            key="xtle_fs.sync_workers")
+        return int(workers or settings.XTLE_FS_SYNC_WORKERS)
+
+    def get_sync_pipeline(self):
+        """Returns a ``SyncPipeline`` if more than one sync worker is
+        configured
+        """
+        if self.sync_workers > 1:
+            return SyncPipeline(self.sync_workers)
+
+    def iter_parsed(self, pipeline, stores_fs, prepare):
+        """Yields ``(store_fs, store_file)`` for ``stores_fs``
+
+        If there is no pipeline the files are not parsed ahead, and are left
+        for ``FSFile`` to parse.
+        """
+        if pipeline is None:
+            return ((store_fs, None) for store_fs in stores_fs)
+        return pipeline.parse(stores_fs, methodcaller(prepare))
+
+    @cached_property
+    def file_digests(self):
+        return FileDigests(self.project)
+
     @cached_property
     def resources(self):
         return fs_resources.get(self.__class__)(self.project)
@@ -466,16 +500,26 @@ class Plugin(object):
             sfs[fs_state.kwargs["store_fs"]] = fs_state
         _sfs = StoreFS.objects.filter(
             id__in=sfs.keys()).select_related("store", "store__data")
-        for store_fs in _sfs:
-            store_fs.file.pull(user=self.xtle_user)
-            if store_fs.store and store_fs.store.data:
-                state.resources.xtle_revisions[
-                    store_fs.store_id] = store_fs.store.data.max_unit_revision
-            state.resources.file_hashes[
-                store_fs.xtle_path] = store_fs.file.latest_hash
-            fs_state = sfs[store_fs.id]
-            fs_state.store_fs = store_fs
-            response.add("pulled_to_xtle", fs_state=fs_state)
+        pipeline = self.get_sync_pipeline()
+        try:
+            parsed = self.iter_parsed(pipeline, _sfs, "prepare_pull")
+            for store_fs, store_file in parsed:
+                with transaction.atomic():
+                    store_fs.file.pull(
+                        user=self.xtle_user,
+                        store_file=store_file)
+                if store_fs.store and store_fs.store.data:
+                    state.resources.xtle_revisions[
+                        store_fs.store_id] = (
+                            store_fs.store.data.max_unit_revision)
+                state.resources.file_hashes[
+                    store_fs.xtle_path] = store_fs.file.latest_hash
+                fs_state = sfs[store_fs.id]
+                fs_state.store_fs = store_fs
+                response.add("pulled_to_xtle", fs_state=fs_state)
+        finally:
+            if pipeline is not None:
+                pipeline.close()
         return response
 
     @responds_to_state
@@ -496,15 +540,35 @@ class Plugin(object):
                 for fs_state
                 in pushable])
         stores_fs = {sfs.id: sfs for sfs in stores_fs.select_related("store")}
-        for fs_state in pushable:
-            store_fs = stores_fs[fs_state.store_fs.id]
-            fs_state.store_fs = store_fs
-            store_fs.file.push()
-            state.resources.xtle_revisions[
-                store_fs.store_id] = store_fs.store.data.max_unit_revision
+        pipeline = self.get_sync_pipeline()
+        fsync_batch = FSyncBatch()
+        pushed = []
+        try:
+            parsed = self.iter_parsed(
+                pipeline,
+                [stores_fs[fs_state.store_fs.id] for fs_state in pushable],
+                "prepare_push")
+            for fs_state, (store_fs, store_file) in zip(pushable, parsed):
+                fs_state.store_fs = store_fs
+                store_fs.file.fsync_batch = fsync_batch
+                store_fs.file.push(
+                    store_file=store_file,
+                    write=(
+                        partial(pipeline.write, store_fs.file)
+                        if pipeline is not None
+                        else None))
+                state.resources.xtle_revisions[
+                    store_fs.store_id] = store_fs.store.data.max_unit_revision
+                pushed.append(store_fs)
+                response.add('pushed_to_fs', fs_state=fs_state)
+        finally:
+            if pipeline is not None:
+                pipeline.close()
+            fsync_batch.flush()
+        # files may have been written by the pipeline workers
+        for store_fs in pushed:
             state.resources.file_hashes[
                 store_fs.xtle_path] = store_fs.file.latest_hash
-            response.add('pushed_to_fs', fs_state=fs_state)
         return response
 
     @responds_to_state
@@ -530,6 +594,14 @@ class Plugin(object):
             response.add("removed", fs_state=fs_state, store_fs=store_fs)
         return response
 
+    def save_snapshots(self, stores):
+        """Saves snapshots of synced stores at their last sync revision,
+        to check for conflicts when they are next synced
+        """
+        for store, last_sync_revision in stores:
+            versioned.get(store.__class__)(store).save_snapshot(
+                last_sync_revision)
+
     @responds_to_state
     @transaction.atomic
     def sync(self, state, response, fs_path=None,
@@ -561,6 +633,7 @@ class Plugin(object):
             "pushed_to_fs", "pulled_to_xtle",
             "merged_from_xtle", "merged_from_fs"]
         fs_to_update = {}
+        to_snapshot = {}
         file_hashes = state.resources.file_hashes
         xtle_revisions = state.resources.xtle_revisions
         for sync_type in sync_types:
@@ -577,12 +650,18 @@ class Plugin(object):
                         last_sync_revision,
                         save=False)
                     fs_to_update[store_fs.id] = store_fs
+                    if last_sync_revision is not None:
+                        to_snapshot[store_fs.store_id] = (
+                            store_fs.store, last_sync_revision)
         if fs_to_update:
             bulk_update(
                 list(fs_to_update.values()),
                 update_fields=[
                     "last_sync_revision", "last_sync_hash",
                     "resolve_conflict", "staged_for_merge"])
+        if to_snapshot:
+            transaction.on_commit(
+                partial(self.save_snapshots, list(to_snapshot.values())))
         if response.made_changes:
             self.expire_sync_cache()
         return response
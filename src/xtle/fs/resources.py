@@ -6,7 +6,6 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-import os
 from fnmatch import fnmatch
 
 from django.db.models import F, Max
@@ -197,17 +196,12 @@ class FSProjectStateResources(object):
 
     @cached_property
     def file_hashes(self):
-        hashes = {}
-
-        def _get_file_hash(path):
-            file_path = os.path.join(
-                self.context.project.local_fs_path,
-                path.strip("/"))
-            if os.path.exists(file_path):
-                return str(os.stat(file_path).st_mtime)
-        for xtle_path, path in self.found_file_matches:
-            hashes[xtle_path] = _get_file_hash(path)
-        return hashes
+        digests = self.context.file_digests.get_digests(
+            [path for __, path in self.found_file_matches])
+        return {
+            xtle_path: digests[path]
+            for xtle_path, path
+            in self.found_file_matches}
 
     @cached_property
     def fs_changed(self):
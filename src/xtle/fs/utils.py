@@ -6,6 +6,8 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import os
+import threading
 from fnmatch import translate
 
 from django.utils.functional import cached_property
@@ -105,3 +107,34 @@ def parse_fs_url(fs_url):
             fs_type = chunks[0]
             fs_url = chunks[1]
     return fs_type, fs_url
+
+
+def fsync_directory(directory):
+    """Flush a directory entry, eg after renaming a file into it"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FSyncBatch(object):
+    """Collects directories that files were written to, so that each
+    directory is only fsynced once
+
+    Directories can be added from multiple threads.
+    """
+
+    def __init__(self):
+        self.directories = set()
+        self.lock = threading.Lock()
+
+    def add(self, directory):
+        with self.lock:
+            self.directories.add(directory)
+
+    def flush(self):
+        with self.lock:
+            directories, self.directories = self.directories, set()
+        for directory in sorted(directories):
+            fsync_directory(directory)
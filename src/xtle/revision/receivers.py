@@ -13,6 +13,7 @@ from xtle.core.delegate import crud, revision_updater
 from xtle.core.signals import create, update, update_revisions
 from xtle.app.models import Directory
 from xtle.data.models import StoreData
+from xtle.data.scheduler import data_refresh
 from xtle.project.models import Project
 from xtle.store.models import Store
 from xtle.tp.models import TranslationProject
@@ -32,10 +33,7 @@ def handle_store_data_obj_update(**kwargs):
 
 @receiver(post_save, sender=StoreData)
 def handle_storedata_save(**kwargs):
-    update_revisions.send(
-        Store,
-        instance=kwargs["instance"].store,
-        keys=["stats", "checks"])
+    data_refresh.schedule([kwargs["instance"].store], data=False)
 
 
 @receiver(update_revisions, sender=Store)
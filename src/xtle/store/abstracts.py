@@ -160,6 +160,10 @@ class AbstractUnit(models.Model, base.TranslationUnit):
     revision = models.IntegerField(null=False, default=0, db_index=True,
                                    blank=True)
 
+    # hash of the fields compared when diffing stores, `None` if unknown
+    content_hash = models.CharField(max_length=32, null=True,
+                                    editable=False)
+
     # Metadata
     creation_time = models.DateTimeField(auto_now_add=True, db_index=True,
                                          editable=False, null=True)
@@ -17,10 +17,16 @@ from xtle.data.models import StoreChecksData, StoreData, TPChecksData, TPData
 from xtle.score.models import UserStoreScore
 
 from .models import Unit
+from .util import add_wordcount_deltas
 
 
 class Updated(object):
     data = False
+    deltas = None
+    # the store data that changed along with the deltas, ``False`` if the
+    # sender of any deltas didnt say
+    fields = None
+    maxima = None
     scores = None
     checks = None
     revisions = False
@@ -53,7 +59,9 @@ def _callback_handler(sender, updated, **kwargs):
                 update_data.send(
                     sender.__class__,
                     instance=sender,
-                    **kwargs)
+                    **(dict(kwargs, **_get_delta_kwargs(updated))
+                       if updated.deltas
+                       else kwargs))
             if updated.scores:
                 update_scores.send(
                     sender.__class__,
@@ -67,6 +75,38 @@ def _callback_handler(sender, updated, **kwargs):
             keys=["stats", "checks"])
 
 
+def _get_delta_kwargs(updated):
+    kwargs = dict(deltas=updated.deltas)
+    if updated.fields is not False:
+        kwargs["fields"] = sorted(updated.fields or [])
+    kwargs.update(
+        (k, v)
+        for k, v
+        in (updated.maxima or {}).items()
+        if v is not False)
+    return kwargs
+
+
+def _collect_delta_kwargs(updated, kwargs):
+    updated.deltas = add_wordcount_deltas(
+        updated.deltas or {},
+        kwargs["deltas"])
+    if kwargs.get("fields") is None:
+        updated.fields = False
+    elif updated.fields is not False:
+        updated.fields = (updated.fields or set()) | set(kwargs["fields"])
+    if updated.maxima is None:
+        updated.maxima = {}
+    for k in ("max_unit_revision", "max_unit_mtime"):
+        if kwargs.get(k) is None:
+            # the field has to be aggregated
+            updated.maxima[k] = False
+        elif updated.maxima.get(k) is not False:
+            updated.maxima[k] = max(
+                updated.maxima.get(k, kwargs[k]),
+                kwargs[k])
+
+
 @contextmanager
 def update_store_after(sender, **kwargs):
     signals = [
@@ -82,11 +122,21 @@ def update_store_after(sender, **kwargs):
         def handle_update_checks(**kwargs):
             if updated.checks is None:
                 updated.checks = set()
-            updated.checks.add(kwargs["instance"].id)
+            if kwargs.get("instance") is not None:
+                updated.checks.add(kwargs["instance"].id)
+            updated.checks.update(kwargs.get("units") or [])
 
         @receiver(update_data, sender=sender.__class__)
         def handle_update_data(**kwargs):
             updated.data = True
+            collect_deltas = (
+                kwargs.get("deltas") is not None
+                and updated.deltas is not False)
+            if collect_deltas:
+                _collect_delta_kwargs(updated, kwargs)
+                return
+            # a full update is needed, so stop collecting deltas
+            updated.deltas = False
             update_data.disconnect(
                 handle_update_data,
                 sender=sender.__class__)
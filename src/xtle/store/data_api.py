@@ -23,14 +23,15 @@ class StoreUnitsAPI(DataAPI):
                         return dict(errors=['Arguments missing.'])
                 return dict(errors=["form invalid"])
 
-        backend = search_backend.get(Unit)
-        total, start, end, units_qs = backend(
-            self.user, **search_form.cleaned_data).search()
+        backend = search_backend.get(Unit)(
+            self.user, **search_form.cleaned_data)
+        total, start, end, units_qs = backend.search()
         context = {
             'api': {'xtle.store.units': {
                 'start': start,
                 'end': end,
                 'total': total,
+                'next_cursor': backend.next_cursor,
                 'units': GroupedResults(units_qs).data}}}
         return context
 
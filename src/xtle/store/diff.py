@@ -6,8 +6,8 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-import difflib
 import logging
+from bisect import bisect_left
 from collections import OrderedDict
 
 from django.db import models
@@ -18,11 +18,91 @@ from xtle.core.delegate import format_diffs
 from .constants import FUZZY, OBSOLETE, TRANSLATED, UNTRANSLATED
 from .fields import to_python as multistring_to_python
 from .unit import UnitProxy
+from .util import get_unit_fingerprint
 
 
 logger = logging.getLogger(__name__)
 
 
+class UniqueSequenceMatcher(object):
+    """Matches sequences of unique keys, such as unitids
+
+    This provides the `get_matching_blocks` and `get_opcodes` interface of
+    `difflib.SequenceMatcher`, but as the sequence members are unique it can
+    match them with a longest increasing subsequence (patience diff) in
+    O(n log n) time.
+    """
+
+    def __init__(self, isjunk=None, a=(), b=()):
+        self.a = a
+        self.b = b
+
+    def get_matches(self):
+        """Returns the longest list of ``(i, j)`` index pairs where
+        ``a[i] == b[j]`` and both ``i`` and ``j`` are increasing.
+        """
+        a_indices = {k: i for i, k in enumerate(self.a)}
+        common = [
+            (a_indices[k], j)
+            for j, k
+            in enumerate(self.b)
+            if k in a_indices]
+        # patience sort on the a indices, tracking the predecessor of each
+        # pile top so the subsequence can be rebuilt
+        tails = []
+        tail_indices = []
+        previous = [None] * len(common)
+        for n, (i, j_) in enumerate(common):
+            pile = bisect_left(tails, i)
+            if pile:
+                previous[n] = tail_indices[pile - 1]
+            if pile == len(tails):
+                tails.append(i)
+                tail_indices.append(n)
+            else:
+                tails[pile] = i
+                tail_indices[pile] = n
+        matches = []
+        n = tail_indices[-1] if tail_indices else None
+        while n is not None:
+            matches.append(common[n])
+            n = previous[n]
+        matches.reverse()
+        return matches
+
+    def get_matching_blocks(self):
+        blocks = []
+        for i, j in self.get_matches():
+            extends_block = (
+                blocks
+                and blocks[-1][0] + blocks[-1][2] == i
+                and blocks[-1][1] + blocks[-1][2] == j)
+            if extends_block:
+                blocks[-1][2] += 1
+            else:
+                blocks.append([i, j, 1])
+        blocks.append([len(self.a), len(self.b), 0])
+        return [tuple(block) for block in blocks]
+
+    def get_opcodes(self):
+        i = j = 0
+        opcodes = []
+        for ai, bj, size in self.get_matching_blocks():
+            tag = ""
+            if i < ai and j < bj:
+                tag = "replace"
+            elif i < ai:
+                tag = "delete"
+            elif j < bj:
+                tag = "insert"
+            if tag:
+                opcodes.append((tag, i, ai, j, bj))
+            i, j = ai + size, bj + size
+            if size:
+                opcodes.append(("equal", ai, i, bj, j))
+        return opcodes
+
+
 class UnitDiffProxy(UnitProxy):
     """Wraps File/DB Unit dicts used by StoreDiff for equality comparison"""
 
@@ -89,8 +169,16 @@ class DiffableStore(object):
     file_unit_class = FileUnit
     db_unit_class = DBUnit
 
+    # any class providing the `difflib.SequenceMatcher` interface
+    sequence_matcher_class = UniqueSequenceMatcher
+    values_chunk_size = 1000
+
+    # fields kept in memory for every unit
     unit_fields = (
-        "unitid", "state", "id", "index", "revision",
+        "unitid", "state", "id", "index", "revision")
+
+    # fields that are only loaded for units that have changed
+    match_fields = (
         "source_f", "target_f", "developer_comment",
         "translator_comment", "locations", "context")
 
@@ -98,13 +186,42 @@ class DiffableStore(object):
         self.target_store = target_store
         self.source_store = source_store
 
+    @property
+    def source_is_db(self):
+        return isinstance(self.source_store, models.Model)
+
+    def get_db_unit(self, unit):
+        diff_unit = {k: unit[k] for k in self.unit_fields}
+        diff_unit["fingerprint"] = unit["content_hash"]
+        return diff_unit
+
     def get_db_units(self, unit_qs):
         diff_units = OrderedDict()
-        units = unit_qs.values(*self.unit_fields).order_by("index")
-        for unit in units:
-            diff_units[unit["unitid"]] = unit
+        units = unit_qs.values(
+            *(self.unit_fields + ("content_hash", ))).order_by("index")
+        for unit in units.iterator():
+            diff_units[unit["unitid"]] = self.get_db_unit(unit)
         return diff_units
 
+    def get_db_values(self, unit_qs, diff_units):
+        """Returns the full values for a list of diff units, keyed by
+        unitid
+        """
+        values = unit_qs.filter(
+            id__in=[unit["id"] for unit in diff_units]).values(
+                *(self.unit_fields + self.match_fields))
+        return {unit["unitid"]: unit for unit in values}
+
+    def get_file_fingerprint(self, file_unit):
+        return get_unit_fingerprint(
+            context=file_unit["context"],
+            developer_comment=file_unit["developer_comment"],
+            locations="\n".join(file_unit["locations"]),
+            source=file_unit["source"],
+            state=file_unit["state"],
+            target=file_unit["target"],
+            translator_comment=file_unit["translator_comment"])
+
     def get_file_unit(self, unit):
         state = UNTRANSLATED
         if unit.isobsolete():
@@ -116,7 +233,7 @@ class DiffableStore(object):
         return {
             "unitid": unit.getid(),
             "context": unit.getcontext(),
-            "locations": unit.getlocations(),
+            "locations": list(unit.getlocations()),
             "source": unit.source,
             "target": unit.target,
             "state": state,
@@ -137,26 +254,72 @@ class DiffableStore(object):
                     (unitid
                      if len(unitid) <= 20
                      else "%s..." % unitid[:17]))
-            diff_units[unit.getid()] = self.get_file_unit(unit)
+            file_unit = self.get_file_unit(unit)
+            diff_units[unit.getid()] = dict(
+                unitid=file_unit["unitid"],
+                state=file_unit["state"],
+                fingerprint=self.get_file_fingerprint(file_unit),
+                unit=unit)
         return diff_units
 
     @cached_property
     def target_units(self):
+        """Compact representation of the target units, keyed by unitid"""
         return self.get_db_units(self.target_store.unit_set)
 
     @cached_property
     def source_units(self):
-        if isinstance(self.source_store, models.Model):
+        """Compact representation of the source units, keyed by unitid"""
+        if self.source_is_db:
             return self.get_db_units(self.source_store.unit_set.live())
         return self.get_file_units(self.source_store.units)
 
+    def get_target_values(self, uids):
+        """Returns full values for the given target unitids"""
+        return self.get_db_values(
+            self.target_store.unit_set,
+            [self.target_units[uid] for uid in uids])
+
+    def get_source_values(self, uids):
+        """Returns full values for the given source unitids"""
+        if self.source_is_db:
+            return self.get_db_values(
+                self.source_store.unit_set,
+                [self.source_units[uid] for uid in uids])
+        return {
+            uid: self.get_file_unit(self.source_units[uid]["unit"])
+            for uid in uids}
+
+    def get_changed(self, uids):
+        """Returns the unitids of units present in both stores whose
+        content differs.
+
+        Units are first compared by fingerprint, and the full values are
+        only loaded for units with differing or unknown fingerprints.
+        """
+        candidates = [
+            uid for uid in uids
+            if (self.target_units[uid]["fingerprint"] is None
+                or (self.target_units[uid]["fingerprint"]
+                    != self.source_units[uid]["fingerprint"]))]
+        for i in range(0, len(candidates), self.values_chunk_size):
+            chunk = candidates[i:i + self.values_chunk_size]
+            target_values = self.get_target_values(chunk)
+            source_values = self.get_source_values(chunk)
+            for uid in chunk:
+                changed = (
+                    self.target_unit_class(target_values[uid])
+                    != self.source_unit_class(source_values[uid]))
+                if changed:
+                    yield uid
+
     @property
     def target_unit_class(self):
         return self.db_unit_class
 
     @property
     def source_unit_class(self):
-        if isinstance(self.source_store, models.Model):
+        if self.source_is_db:
             return self.db_unit_class
         return self.file_unit_class
 
@@ -271,9 +434,10 @@ class StoreDiff(object):
 
     @cached_property
     def opcodes(self):
-        sm = difflib.SequenceMatcher(None,
-                                     self.active_target_units,
-                                     self.new_unit_list)
+        sm = self.diffable.sequence_matcher_class(
+            None,
+            self.active_target_units,
+            self.new_unit_list)
         return sm.get_opcodes()
 
     @cached_property
@@ -306,19 +470,22 @@ class StoreDiff(object):
     def get_units_to_add(self):
         offset = 0
         to_add = []
-        proxy = (
-            isinstance(self.source_store, models.Model)
-            and DBUnit or FileUnit)
-
         for (insert_at, uids_add, next_index_, delta) in self.insert_points:
             for index, uid in enumerate(uids_add):
                 source_unit = self.source_units.get(uid)
                 if source_unit and uid not in self.target_units:
                     new_unit_index = insert_at + index + 1 + offset
-                    to_add += [(proxy(source_unit), new_unit_index)]
+                    to_add += [(uid, new_unit_index)]
             if delta > 0:
                 offset += delta
-        return to_add
+        if not to_add:
+            return to_add
+        values = self.diffable.get_source_values(
+            [uid for uid, new_unit_index_ in to_add])
+        return [
+            (self.diffable.source_unit_class(values[uid]), new_unit_index)
+            for uid, new_unit_index
+            in to_add]
 
     def get_units_to_obsolete(self):
         return [unit['id'] for unitid, unit in self.target_units.items()
@@ -346,21 +513,18 @@ class StoreDiff(object):
     def get_updated_sourceids(self):
         """Returns a set of unit DB ids to be updated.
         """
-        update_ids = set()
-
+        uids = []
         for (tag, i1, i2, j1_, j2_) in self.opcodes:
             if tag != 'equal':
                 continue
-            update_ids.update(
-                set(self.target_units[uid]['id']
-                    for uid in self.active_target_units[i1:i2]
-                    if (uid in self.source_units
-                        and (
-                            self.diffable.target_unit_class(
-                                self.target_units[uid])
-                            != self.diffable.source_unit_class(
-                                self.source_units[uid])))))
-        return update_ids
+            uids += [
+                uid
+                for uid in self.active_target_units[i1:i2]
+                if uid in self.source_units]
+        return set(
+            self.target_units[uid]['id']
+            for uid
+            in self.diffable.get_changed(uids))
 
     def has_changes(self, diff):
         for k, v in diff.items():
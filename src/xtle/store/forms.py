@@ -329,6 +329,7 @@ def unit_comment_form_factory(language):
 class UnitSearchForm(forms.Form):
 
     offset = forms.IntegerField(required=False)
+    cursor = forms.CharField(required=False)
     path = forms.CharField(
         max_length=2048,
         required=True)
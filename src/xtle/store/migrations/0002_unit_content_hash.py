@@ -0,0 +1,18 @@
+# Generated by Django 3.0.3 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xtle_store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+    ]
@@ -26,7 +26,7 @@ from xtle.core.delegate import (
     terminology_matcher, wordcount)
 from xtle.core.log import STORE_DELETED, STORE_OBSOLETE, store_log
 from xtle.core.models import Revision
-from xtle.core.search import SearchBroker
+from xtle.core.search import SearchBroker, TMUpdateQueue
 from xtle.core.signals import toggle, update_checks, update_data
 from xtle.core.url_helpers import (
     get_editor_filter, split_xtle_path, to_tp_relative_path)
@@ -46,7 +46,9 @@ from .constants import (
 from .managers import SuggestionManager, UnitManager
 from .store.deserialize import StoreDeserialization
 from .store.serialize import StoreSerialization
-from .util import vfolders_installed
+from .util import (
+    LIVE_UNIT_DATA_FIELDS, get_tm_document, get_unit_fingerprint,
+    get_wordcount_deltas, vfolders_installed)
 
 
 logger = logging.getLogger(__name__)
@@ -62,6 +64,16 @@ def get_tm_broker():
     return TM_BROKER
 
 
+TM_QUEUE = None
+
+
+def get_tm_queue():
+    global TM_QUEUE
+    if TM_QUEUE is None:
+        TM_QUEUE = TMUpdateQueue(get_tm_broker)
+    return TM_QUEUE
+
+
 # # # # # # # # Quality Check # # # # # # #
 
 
@@ -267,6 +279,13 @@ class Unit(AbstractUnit):
         except UnitChange.DoesNotExist:
             return False
 
+    @property
+    def source_wordcount(self):
+        try:
+            return self.unit_source.source_wordcount
+        except UnitSource.DoesNotExist:
+            return 0
+
     def refresh_from_db(self, *args, **kwargs):
         super(Unit, self).refresh_from_db(*args, **kwargs)
         if kwargs.get("fields") and "change" not in kwargs["fields"]:
@@ -291,6 +310,7 @@ class Unit(AbstractUnit):
             or SubmissionTypes.SYSTEM)
         super(Unit, self).save(*args, **kwargs)
         timestamp = self.mtime
+        old_wordcount = 0
         if created:
             unit_source = UnitSource(unit=self)
             unit_source.created_by = user
@@ -298,8 +318,11 @@ class Unit(AbstractUnit):
             timestamp = self.creation_time
         elif self.source_updated:
             unit_source = self.unit_source
+            old_wordcount = unit_source.source_wordcount
         if created or self.source_updated:
             unit_source.save()
+        elif self.state_updated:
+            old_wordcount = self.source_wordcount
         if self.updated and (created or not self.changed):
             self.change = UnitChange(
                 unit=self,
@@ -325,8 +348,32 @@ class Unit(AbstractUnit):
                 self.change.reviewed_by = reviewed_by
                 self.change.reviewed_on = timestamp
             self.change.save()
+        fields = ["last_submission"]
+        liveness_updated = (
+            created
+            or (self.state_updated
+                and ((self._frozen.state <= OBSOLETE)
+                     != (self.state <= OBSOLETE))))
+        if liveness_updated:
+            fields += LIVE_UNIT_DATA_FIELDS
         update_data.send(
-            self.store.__class__, instance=self.store)
+            self.store.__class__,
+            instance=self.store,
+            deltas=get_wordcount_deltas(
+                old_state=None if created else self._frozen.state,
+                old_wordcount=old_wordcount,
+                new_state=self.state,
+                new_wordcount=(
+                    self.source_wordcount
+                    if (created
+                        or self.source_updated
+                        or self.state_updated)
+                    else 0)),
+            fields=fields,
+            max_unit_revision=self.revision,
+            max_unit_mtime=self.mtime)
+        # later saves compute their changes from this one
+        self._frozen = frozen.get(Unit)(self)
 
     def get_absolute_url(self):
         return self.store.get_absolute_url()
@@ -372,53 +419,6 @@ class Unit(AbstractUnit):
         """
         return self.unit_syncer.convert(unitclass)
 
-    def sync(self, unit, unitclass=None):
-        """Sync in file unit with translations from the DB."""
-        changed = False
-
-        if not self.isobsolete() and unit.isobsolete():
-            unit.resurrect()
-            changed = True
-
-        target = (
-            unitclass(self).target
-            if unitclass
-            else unit.target)
-
-        if unit.target != target:
-            if unit.hasplural():
-                nplurals = self.store.translation_project.language.nplurals
-                target_plurals = len(target.strings)
-                strings = target.strings
-                if target_plurals < nplurals:
-                    strings.extend([u'']*(nplurals - target_plurals))
-                if unit.target.strings != strings:
-                    unit.target = strings
-                    changed = True
-            else:
-                unit.target = target
-                changed = True
-
-        self_notes = self.getnotes(origin="translator")
-        unit_notes = unit.getnotes(origin="translator")
-        if unit_notes != (self_notes or ''):
-            if self_notes != '':
-                unit.addnote(self_notes, origin="translator",
-                             position="replace")
-            else:
-                unit.removenotes()
-            changed = True
-
-        if unit.isfuzzy() != self.isfuzzy():
-            unit.markfuzzy(self.isfuzzy())
-            changed = True
-
-        if self.isobsolete() and not unit.isobsolete():
-            unit.makeobsolete()
-            changed = True
-
-        return changed
-
     def update(self, unit, user=None):
         """Update in-DB translation from the given :param:`unit`.
 
@@ -605,35 +605,25 @@ class Unit(AbstractUnit):
 # # # # # # # # # # # TranslationUnit # # # # # # # # # # # # # #
 
     def update_tmserver(self):
-        obj = {
-            'id': self.id,
-            # 'revision' must be an integer for statistical queries to work
-            'revision': self.revision,
-            'project': self.store.translation_project.project.fullname,
-            'path': self.store.xtle_path,
-            'source': self.source,
-            'target': self.target,
-            'username': '',
-            'fullname': '',
-            'email_md5': '',
-        }
-        if self.changed and self.change.submitted_on:
-            obj.update({
-                'iso_submitted_on': self.change.submitted_on.isoformat(),
-                'display_submitted_on': dateformat.format(
-                    self.change.submitted_on),
-            })
-
-        if self.changed and self.change.submitted_by:
-            obj.update({
-                'username': self.change.submitted_by.username,
-                'fullname': self.change.submitted_by.full_name,
-                'email_md5': md5(
-                    force_bytes(self.change.submitted_by.email)).hexdigest(),
-            })
-
-        get_tm_broker().update(self.store.translation_project.language.code,
-                               obj)
+        submitted_on = None
+        submitted_by = None
+        if self.changed:
+            submitted_on = self.change.submitted_on
+            submitted_by = self.change.submitted_by
+        obj = get_tm_document(
+            self.id,
+            self.revision,
+            self.store.translation_project.project.fullname,
+            self.store.xtle_path,
+            self.source,
+            self.target,
+            submitted_on=submitted_on,
+            username=submitted_by and submitted_by.username,
+            fullname=submitted_by and submitted_by.full_name,
+            email=submitted_by and submitted_by.email)
+        get_tm_queue().add(
+            self.store.translation_project.language.code,
+            obj)
 
     def get_tm_suggestions(self):
         return get_tm_broker().search(self)
@@ -663,6 +653,16 @@ class Unit(AbstractUnit):
         else:
             self.translator_comment = text
 
+    def get_content_hash(self):
+        return get_unit_fingerprint(
+            context=self.context,
+            developer_comment=self.developer_comment,
+            locations=self.locations,
+            source=self.source_f,
+            state=self.state,
+            target=self.target_f,
+            translator_comment=self.translator_comment)
+
     def getid(self):
         return self.unitid
 
@@ -97,6 +97,7 @@ def handle_unit_pre_save(**kwargs):
     unitid = uniqueid.get(unit.__class__)(unit)
     if unitid.changed:
         unit.setid(unitid.getid())
+    unit.content_hash = unit.get_content_hash()
 
 
 @receiver(post_save, sender=UnitChange)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Xtle contributors.
+#
+# This file is a part of the Xtle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import json
+import logging
+import zlib
+from hashlib import md5
+
+from django.utils.encoding import force_bytes
+from django.utils.functional import cached_property
+
+from xtle.core.cache import get_cache
+
+from .fields import to_db as multistring_to_db
+from .fields import to_python as multistring_to_python
+
+
+logger = logging.getLogger(__name__)
+
+
+FUZZY_FLAG = 1
+OBSOLETE_FLAG = 2
+TARGET_FLAG = 4
+COMMENT_FLAG = 8
+
+
+def get_text_hash(text):
+    return md5(force_bytes(text or "")).hexdigest()
+
+
+def get_target_hash(target):
+    return get_text_hash(
+        multistring_to_db(multistring_to_python(target)))
+
+
+class HashedText(object):
+    """Stands in for a text that is only known by its hash, and compares
+    equal to texts with the same hash
+    """
+
+    __slots__ = ("digest", "empty", "hasher")
+
+    def __init__(self, digest, empty, hasher=get_text_hash):
+        self.digest = digest
+        self.empty = empty
+        self.hasher = hasher
+
+    def __eq__(self, other):
+        if isinstance(other, HashedText):
+            return self.digest == other.digest
+        return self.digest == self.hasher(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __bool__(self):
+        return not self.empty
+
+
+class StoreSnapshots(object):
+    """Compressed snapshots of the units of stores at a revision
+
+    Each store keeps only the snapshot for the latest revision that was
+    saved, so snapshots for older syncs are dropped as stores are synced.
+    """
+
+    ns = "xtle.store.snapshots"
+    sw_version = 1
+
+    @cached_property
+    def cache(self):
+        return get_cache("lru")
+
+    def get_cache_key(self, store):
+        return "%s.%s.%s" % (self.ns, self.sw_version, store.pk)
+
+    def serialize(self, units):
+        rows = []
+        for unit in units:
+            flags = 0
+            if unit.isfuzzy():
+                flags |= FUZZY_FLAG
+            if unit.isobsolete():
+                flags |= OBSOLETE_FLAG
+            if unit.target:
+                flags |= TARGET_FLAG
+            if unit.translator_comment:
+                flags |= COMMENT_FLAG
+            rows.append(
+                (unit.getid(),
+                 flags,
+                 get_target_hash(unit.target),
+                 get_text_hash(unit.translator_comment)))
+        return zlib.compress(json.dumps(rows).encode("utf-8"))
+
+    def deserialize(self, data, unit_class):
+        units = {}
+        for unitid, flags, target_hash, comment_hash in json.loads(
+                zlib.decompress(data).decode("utf-8")):
+            unit = unit_class(
+                unitid,
+                HashedText(
+                    target_hash,
+                    not flags & TARGET_FLAG,
+                    get_target_hash),
+                None,
+                HashedText(
+                    comment_hash,
+                    not flags & COMMENT_FLAG))
+            unit.fuzzy = bool(flags & FUZZY_FLAG)
+            unit.obsolete = bool(flags & OBSOLETE_FLAG)
+            units[unitid] = unit
+        return units
+
+    def get_revision(self, store):
+        """Returns the revision of the snapshot saved for ``store``"""
+        snapshot = self.cache.get(self.get_cache_key(store))
+        if snapshot is not None:
+            return snapshot[0]
+
+    def get(self, store, revision, unit_class):
+        """Returns ``unitid: unit`` for ``store`` at ``revision`` if a
+        snapshot was saved, with units created with ``unit_class``
+        """
+        snapshot = self.cache.get(self.get_cache_key(store))
+        if snapshot is None or snapshot[0] != revision:
+            return None
+        try:
+            return self.deserialize(snapshot[1], unit_class)
+        except (ValueError, zlib.error) as e:
+            logger.warning(
+                "[store] Discarding bad snapshot for %s: %s",
+                store.pk,
+                e)
+            return None
+
+    def set(self, store, revision, units):
+        key = self.get_cache_key(store)
+        snapshot = self.cache.get(key)
+        if snapshot is not None and snapshot[0] > revision:
+            # keep the more recent snapshot
+            return
+        self.cache.set(key, (revision, self.serialize(units)))
+
+
+snapshots = StoreSnapshots()
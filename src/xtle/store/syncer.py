@@ -16,12 +16,43 @@ from django.utils.functional import cached_property
 
 from xtle.core.delegate import format_classes
 
-from .models import Unit
+from .constants import FUZZY, OBSOLETE
 
 
 logger = logging.getLogger(__name__)
 
 
+class SyncUnit(object):
+    """The values of a DB unit that are synced to an existing file unit
+
+    Provides the parts of the ``Unit`` API that ``UnitSyncer`` uses to
+    read them, without loading ``Unit`` objects.
+    """
+
+    __slots__ = ("unitid", "target", "state", "translator_comment")
+
+    def __init__(self, unitid, target, state, translator_comment):
+        self.unitid = unitid
+        self.target = target
+        self.state = state
+        self.translator_comment = translator_comment
+
+    def getid(self):
+        return self.unitid
+
+    def getnotes(self, origin=None):
+        if origin in (None, "translator"):
+            return self.translator_comment or ''
+        # only translator comments are synced to existing file units
+        return ''
+
+    def isfuzzy(self):
+        return self.state == FUZZY
+
+    def isobsolete(self):
+        return self.state == OBSOLETE
+
+
 class UnitSyncer(object):
 
     def __init__(self, unit, raw=False):
@@ -118,6 +149,7 @@ class UnitSyncer(object):
 
 class StoreSyncer(object):
     unit_sync_class = UnitSyncer
+    sync_unit_fields = ("unitid", "target_f", "state", "translator_comment")
 
     def __init__(self, store):
         self.store = store
@@ -191,9 +223,9 @@ class StoreSyncer(object):
              for uid
              in new_ids - old_ids])
 
-    def get_units_to_obsolete(self, disk_store, old_ids, new_ids):
+    def get_units_to_obsolete(self, disk_index, old_ids, new_ids):
         for uid in old_ids - new_ids:
-            unit = disk_store.findid(uid)
+            unit = disk_index.get(uid)
             if unit and not unit.isobsolete():
                 yield unit
 
@@ -232,16 +264,25 @@ class StoreSyncer(object):
         return dict(
             self.store.unit_set.live().values_list('unitid', 'id'))
 
+    @cached_property
+    def nplurals(self):
+        return self.language.nplurals
+
+    def get_disk_index(self, disk_store):
+        """build a mapping of unit ids to the units in the file"""
+        return {unit.getid(): unit for unit in disk_store.units}
+
     def sync(self, disk_store, last_revision,
              update_structure=False, conservative=True):
         logger.debug(u"[sync] Syncing: %s", self.store.xtle_path)
         old_ids = set(disk_store.getids())
-        new_ids = set(self.dbid_index.keys())
+        disk_index = self.get_disk_index(disk_store)
         file_changed = False
         changes = {}
         if update_structure:
+            new_ids = set(self.dbid_index.keys())
             obsolete_units = self.get_units_to_obsolete(
-                disk_store, old_ids, new_ids)
+                disk_index, old_ids, new_ids)
             new_units = self.get_new_units(old_ids, new_ids)
             if obsolete_units or new_units:
                 file_changed = True
@@ -253,11 +294,9 @@ class StoreSyncer(object):
                      new_units,
                      conservative=conservative)
         changes["updated"] = self.sync_units(
-            disk_store,
+            disk_index,
             self.get_common_units(
-                set(self.dbid_index.get(uid)
-                    for uid
-                    in old_ids & new_ids),
+                old_ids,
                 last_revision,
                 conservative))
         return bool(file_changed or any(changes.values())), changes
@@ -272,29 +311,75 @@ class StoreSyncer(object):
             filter_by.update({'revision__gt': self.store.last_sync_revision})
         return filter_by
 
-    def get_modified_units(self, last_revision):
-        return set(
-            Unit.objects.filter(**self.get_revision_filters(last_revision))
-                        .values_list('id', flat=True).distinct()
-            if (last_revision or 0) > (self.store.last_sync_revision or 0)
-            else [])
-
-    def get_common_units(self, common_dbids, last_revision, conservative):
+    def get_common_units(self, old_ids, last_revision, conservative):
+        """Returns ``SyncUnit``s for live units that are in the file, only
+        those modified since the last sync if ``conservative``
+        """
+        units = self.store.unit_set.live()
         if conservative:
+            if (last_revision or 0) <= (self.store.last_sync_revision or 0):
+                return []
             # Sync only modified units
-            common_dbids &= self.get_modified_units(last_revision)
-        return self.store.findid_bulk(list(common_dbids))
-
-    def sync_units(self, disk_store, units):
+            units = units.filter(**self.get_revision_filters(last_revision))
+        return [
+            SyncUnit(*values)
+            for values
+            in units.values_list(*self.sync_unit_fields).iterator()
+            if values[0] in old_ids]
+
+    def sync_units(self, disk_index, units):
         updated = 0
         for unit in units:
-            match = disk_store.findid(unit.getid())
-            if match is not None:
-                changed = unit.sync(match, unitclass=self.unit_sync_class)
-                if changed:
-                    updated += 1
+            match = disk_index.get(unit.getid())
+            if match is not None and self.sync_unit(unit, match):
+                updated += 1
         return updated
 
+    def sync_unit(self, unit, disk_unit):
+        """Sync a file unit with the translation from ``unit``
+
+        :return: ``True`` if the file unit was changed.
+        """
+        changed = False
+
+        if not unit.isobsolete() and disk_unit.isobsolete():
+            disk_unit.resurrect()
+            changed = True
+
+        target = self.unit_sync_class(unit).target
+
+        if disk_unit.target != target:
+            if disk_unit.hasplural():
+                target_plurals = len(target.strings)
+                strings = target.strings
+                if target_plurals < self.nplurals:
+                    strings.extend([u'']*(self.nplurals - target_plurals))
+                if disk_unit.target.strings != strings:
+                    disk_unit.target = strings
+                    changed = True
+            else:
+                disk_unit.target = target
+                changed = True
+
+        notes = unit.getnotes(origin="translator")
+        if disk_unit.getnotes(origin="translator") != notes:
+            if notes != '':
+                disk_unit.addnote(notes, origin="translator",
+                                  position="replace")
+            else:
+                disk_unit.removenotes()
+            changed = True
+
+        if disk_unit.isfuzzy() != unit.isfuzzy():
+            disk_unit.markfuzzy(unit.isfuzzy())
+            changed = True
+
+        if unit.isobsolete() and not disk_unit.isobsolete():
+            disk_unit.makeobsolete()
+            changed = True
+
+        return changed
+
     def update_store_header(self, disk_store, **kwargs_):
         disk_store.settargetlanguage(self.language.code)
         disk_store.setsourcelanguage(self.source_language.code)
@@ -6,18 +6,54 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models import Max
+import base64
+import binascii
+import json
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
+from xtle.core.cache import get_cache
 from xtle.store.constants import SIMPLY_SORTED
 from xtle.store.models import Unit
 from xtle.store.unit.filters import UnitSearchFilter, UnitTextSearch
 
 
+def encode_cursor(key, position):
+    """Returns a cursor token for the unit with ``key`` at ``position`` in
+    the search results
+    """
+    return base64.urlsafe_b64encode(
+        force_bytes(json.dumps(list(key) + [position]))).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Returns ``(key, position)`` for a cursor token, or ``None`` if the
+    token is not valid
+    """
+    try:
+        xtle_path, index, pk, position = json.loads(
+            base64.urlsafe_b64decode(force_bytes(cursor)).decode("utf-8"))
+    except (binascii.Error, TypeError, UnicodeDecodeError, ValueError):
+        return None
+    valid = (
+        isinstance(xtle_path, str)
+        and all(isinstance(v, int) for v in (index, pk, position)))
+    if not valid:
+        return None
+    return (xtle_path, index, pk), position
+
+
 class DBSearchBackend(object):
 
     default_chunk_size = None
-    default_order = "store__xtle_path", "index"
+    default_order = "store__xtle_path", "index", "pk"
+    key_fields = default_order
+    # kwargs that page through results rather than changing them
+    paging_kwargs = ("count", "cursor", "offset", "previous_uids", "uids")
     select_related = (
         'store__translation_project__project',
         'store__translation_project__language')
@@ -56,6 +92,10 @@ class DBSearchBackend(object):
     def offset(self):
         return self.kwargs.get("offset", None)
 
+    @property
+    def cursor(self):
+        return self.kwargs.get("cursor") or None
+
     @property
     def previous_uids(self):
         return self.kwargs.get("previous_uids", []) or []
@@ -144,8 +184,108 @@ class DBSearchBackend(object):
     def results(self):
         return self.sort_qs(self.filter_qs(self.units_qs))
 
+    @property
+    def keyset_paginated(self):
+        """Results are in the default order, so can be paged by key"""
+        return not (self.unit_filter and self.sort_by is not None)
+
+    @property
+    def total_cache_key(self):
+        kwargs = sorted(
+            (k, str(v))
+            for k, v
+            in self.kwargs.items()
+            if k not in self.paging_kwargs)
+        return "xtle.store.unit.search.total.%s.%s" % (
+            getattr(self.request_user, "pk", None),
+            md5(force_bytes(json.dumps(kwargs))).hexdigest())
+
+    @cached_property
+    def total(self):
+        """Count of the results, which may be cached for
+        ``XTLE_UNIT_SEARCH_TOTAL_TIMEOUT`` seconds and so approximate
+        """
+        timeout = settings.XTLE_UNIT_SEARCH_TOTAL_TIMEOUT
+        if not timeout:
+            return self.results.count()
+        cache = get_cache()
+        total = cache.get(self.total_cache_key)
+        if total is None:
+            total = self.results.count()
+            cache.set(self.total_cache_key, total, timeout)
+        return total
+
+    def key_lt(self, key):
+        xtle_path, index, pk = key
+        return (
+            Q(store__xtle_path__lt=xtle_path)
+            | Q(store__xtle_path=xtle_path, index__lt=index)
+            | Q(store__xtle_path=xtle_path, index=index, pk__lt=pk))
+
+    def key_gt(self, key):
+        xtle_path, index, pk = key
+        return (
+            Q(store__xtle_path__gt=xtle_path)
+            | Q(store__xtle_path=xtle_path, index__gt=index)
+            | Q(store__xtle_path=xtle_path, index=index, pk__gt=pk))
+
+    def get_key(self, uid):
+        return self.results.filter(pk=uid).values_list(
+            *self.key_fields).first()
+
+    def get_position(self, key):
+        """Position of the unit with ``key`` in the results"""
+        return self.results.filter(self.key_lt(key)).count()
+
+    def get_page(self, start, qs, skip=0):
+        """Returns ``(start, end, pks)`` for a page of results in ``qs``
+        starting at ``start``, and sets ``next_cursor`` for the next page
+        """
+        keys = list(
+            qs.values_list(*self.key_fields)[skip:skip + 2 * self.chunk_size])
+        if keys:
+            self.next_cursor = encode_cursor(keys[-1], start + len(keys))
+        return start, start + len(keys), [key[-1] for key in keys]
+
     def search(self):
-        total = self.results.count()
+        self.next_cursor = None
+        if self.chunk_size is None or not self.keyset_paginated:
+            return self.search_by_offset()
+        total = self.total
+        find_unit = (
+            self.language_code
+            and self.project_code
+            and self.filename
+            and self.uids)
+        cursor = self.cursor and decode_cursor(self.cursor)
+        if cursor:
+            key, start = cursor
+            return (total, ) + self.get_page(
+                start,
+                self.results.filter(self.key_gt(key)))
+        if self.previous_uids and self.offset and not find_unit:
+            # continue from the last of the previous results
+            # let the db pick the last key, as it orders paths by collation
+            key = self.results.filter(
+                pk__in=self.previous_uids).order_by(
+                    *self.key_fields).values_list(*self.key_fields).last()
+            if key is not None:
+                return (total, ) + self.get_page(
+                    self.get_position(key) + 1,
+                    self.results.filter(self.key_gt(key)))
+        start = self.offset or 0
+        if find_unit:
+            key = self.get_key(self.uids[0])
+            if key is not None:
+                start = (
+                    int(self.get_position(key) / (2 * self.chunk_size))
+                    * (2 * self.chunk_size))
+        if start > total:
+            return total, total, total, []
+        return (total, ) + self.get_page(start, self.results, skip=start)
+
+    def search_by_offset(self):
+        total = self.total
         start = self.offset
 
         if (start or 0) > (total + len(self.previous_uids)):
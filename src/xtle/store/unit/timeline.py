@@ -46,13 +46,60 @@ class UnitTimelineLog(UnitLog):
     def suggestion_qs(self):
         return Suggestion.objects
 
+    @property
+    def submissions(self):
+        return super(UnitTimelineLog, self).submissions.select_related(
+            "suggestion", "quality_check")
+
+
+class TimelinePrefetch(object):
+    """Data related to the events in a unit's timeline, loaded for all of
+    its suggestions at once
+    """
+
+    def __init__(self, unit):
+        self.unit = unit
+
+    @cached_property
+    def suggestion_comments(self):
+        """Returns ``suggestion_id: comment`` with the first comment on
+        each of the unit's suggestions
+        """
+        suggestions = Suggestion.objects.filter(
+            unit_id=self.unit.id).values_list("id", flat=True)
+        comments = get_comment_model().objects.for_model(Suggestion).filter(
+            object_pk__in=[str(pk) for pk in suggestions])
+        suggestion_comments = {}
+        for object_pk, comment in comments.values_list("object_pk",
+                                                       "comment"):
+            suggestion_comments.setdefault(int(object_pk), comment)
+        return suggestion_comments
+
+    @cached_property
+    def suggestion_targets(self):
+        """Returns ``suggestion_id: target`` with the target submitted when
+        each of the unit's suggestions was accepted
+        """
+        submissions = Submission.objects.filter(
+            unit_id=self.unit.id,
+            field=SubmissionFields.TARGET,
+            suggestion__isnull=False)
+        suggestion_targets = {}
+        for suggestion_id, new_value in submissions.values_list(
+                "suggestion_id", "new_value"):
+            suggestion_targets.setdefault(suggestion_id, new_value)
+        return suggestion_targets
+
 
 class SuggestionEvent(object):
     def __init__(self, suggestion, **kwargs):
         self.suggestion = suggestion
+        self.prefetched = kwargs.get("prefetched")
 
-    @property
+    @cached_property
     def comment(self):
+        if self.prefetched is not None:
+            return self.prefetched.suggestion_comments.get(self.suggestion.id)
         comments = get_comment_model().objects.for_model(Suggestion)
         comments = comments.filter(
             object_pk=self.suggestion.id).values_list("comment", flat=True)
@@ -77,7 +124,7 @@ class SuggestionAddedEvent(SuggestionEvent):
 class SuggestionAcceptedEvent(SuggestionEvent):
 
     def __init__(self, suggestion, **kwargs):
-        super(SuggestionAcceptedEvent, self).__init__(suggestion)
+        super(SuggestionAcceptedEvent, self).__init__(suggestion, **kwargs)
 
     @property
     def context(self):
@@ -95,16 +142,23 @@ class SuggestionAcceptedEvent(SuggestionEvent):
                 u'with comment: %(comment)s',
                 params)
 
-        target = self.suggestion.target
-        submission = self.suggestion.submission_set.filter(
-            field=SubmissionFields.TARGET).first()
-        if submission:
-            target = submission.new_value
         return dict(
-            value=target,
+            value=self.target,
             translation=True,
             description=format_html(sugg_accepted_desc))
 
+    @property
+    def target(self):
+        if self.prefetched is not None:
+            return self.prefetched.suggestion_targets.get(
+                self.suggestion.id,
+                self.suggestion.target)
+        submission = self.suggestion.submission_set.filter(
+            field=SubmissionFields.TARGET).first()
+        if submission:
+            return submission.new_value
+        return self.suggestion.target
+
 
 class SuggestionRejectedEvent(SuggestionEvent):
 
@@ -232,12 +286,16 @@ class Timeline(object):
         self.object = obj
         self.log = UnitTimelineLog(self.object)
         self.events_adapter = grouped_events.get(self.log.__class__)(self.log)
+        self.prefetched = TimelinePrefetch(self.object)
 
     def grouped_events(self, **kwargs):
         groups = []
         target_event = None
         for __, group in self.events_adapter.grouped_events(**kwargs):
-            event_group = EventGroup(group, target_event)
+            event_group = EventGroup(
+                group,
+                target_event,
+                prefetched=self.prefetched)
             if event_group.target_event:
                 target_event = event_group.target_event
             if event_group.events:
@@ -303,9 +361,11 @@ class UnitTimelineGroupedEvents(GroupedEvents):
 
 
 class EventGroup(object):
-    def __init__(self, log_events, related_target_event=None):
+    def __init__(self, log_events, related_target_event=None,
+                 prefetched=None):
         self.log_events = OrderedDict()
         self.related_target_event = related_target_event
+        self.prefetched = prefetched
         self.log_event_class = None
         for event in log_events:
             if self.log_event_class is None:
@@ -341,7 +401,8 @@ class EventGroup(object):
             if event_formatter_class is not None:
                 ctx = event_formatter_class(
                     self.log_events[event_action].value,
-                    target_event=self.related_target_event).context
+                    target_event=self.related_target_event,
+                    prefetched=self.prefetched).context
                 if ctx is not None:
                     events.append(ctx)
         return events
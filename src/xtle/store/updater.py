@@ -9,16 +9,25 @@
 import logging
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 from django.utils.functional import cached_property
 
 from xtle.core.delegate import frozen, review, versioned
 from xtle.core.models import Revision
+from xtle.core.signals import update_checks, update_data, update_scores
+from xtle.core.utils.timezone import localdate, make_aware
+from xtle.statistics.models import (
+    Submission, SubmissionFields, SubmissionTypes)
 from xtle.store.contextmanagers import update_store_after
 
-from .constants import OBSOLETE, PARSED, XTLE_WINS
+from .constants import OBSOLETE, PARSED, UNTRANSLATED, XTLE_WINS
 from .diff import StoreDiff
-from .models import Suggestion
-from .util import get_change_str
+from .models import Suggestion, UnitChange, UnitSource
+from .receivers import handle_unit_pre_save, handle_unit_source_pre_save
+from .util import (
+    LIVE_UNIT_DATA_FIELDS, add_wordcount_deltas, get_change_str,
+    get_wordcount_deltas)
 
 
 logger = logging.getLogger(__name__)
@@ -114,8 +123,9 @@ class UnitUpdater(object):
     def db_comment_updated(self):
         if not self.old_unit:
             return True
-        return (self.db_unit.translator_comment or ""
-                != self.old_unit.getnotes(origin="translator"))
+        # old_unit goes first so that texts from snapshots compare by hash
+        return (self.old_unit.getnotes(origin="translator")
+                != (self.db_unit.translator_comment or ""))
 
     @cached_property
     def db_state_updated(self):
@@ -130,7 +140,7 @@ class UnitUpdater(object):
     def db_target_updated(self):
         if not self.old_unit:
             return True
-        return self.db_unit.target != self.old_unit.target
+        return self.old_unit.target != self.db_unit.target
 
     @cached_property
     def fs_comment_updated(self):
@@ -139,8 +149,8 @@ class UnitUpdater(object):
         return (
             self.old_unit
             and self.newunit
-            and (self.newunit.getnotes(origin="translator")
-                 != self.old_unit.getnotes(origin="translator")))
+            and (self.old_unit.getnotes(origin="translator")
+                 != self.newunit.getnotes(origin="translator")))
 
     @cached_property
     def fs_state_updated(self):
@@ -157,7 +167,7 @@ class UnitUpdater(object):
             return True
         return (
             self.newunit
-            and self.newunit.target != self.old_unit.target)
+            and self.old_unit.target != self.newunit.target)
 
     @cached_property
     def comment_conflict_found(self):
@@ -290,9 +300,154 @@ class UnitUpdater(object):
         return (updated or reordered), suggested
 
 
+class BulkUnitAdder(object):
+    """Adds new units to a store using bulk inserts
+
+    Units are built in memory together with their `UnitSource` and
+    `UnitChange` and are written in chunks. Checks and data updates are
+    signalled once per chunk rather than once per unit.
+    """
+
+    chunk_size = 500
+
+    def __init__(self, update):
+        self.update = update
+
+    @property
+    def store(self):
+        return self.update.target_store
+
+    @property
+    def unit_model(self):
+        return self.store.UnitClass
+
+    @property
+    def changed_with(self):
+        return self.update.submission_type or SubmissionTypes.SYSTEM
+
+    def build_unit(self, unit, index):
+        newunit = self.unit_model(
+            store=self.store,
+            index=index)
+        newunit.update(unit, user=self.update.user)
+        newunit.revision = self.update.update_revision
+        # bulk_create doesnt send pre_save
+        handle_unit_pre_save(instance=newunit)
+        return newunit
+
+    def build_unit_source(self, unit):
+        unit_source = UnitSource(
+            unit=unit,
+            created_by=self.update.user,
+            created_with=self.changed_with)
+        handle_unit_source_pre_save(instance=unit_source)
+        return unit_source
+
+    def build_unit_change(self, unit):
+        timestamp = unit.creation_time
+        unit.change = UnitChange(
+            unit=unit,
+            changed_with=self.changed_with,
+            submitted_by=self.update.user,
+            submitted_on=timestamp)
+        if unit.comment_updated:
+            unit.change.commented_by = self.update.user
+            unit.change.commented_on = timestamp
+        is_review = (
+            unit.state_updated
+            and (not unit.target_updated
+                 or unit.state == UNTRANSLATED))
+        if is_review:
+            unit.change.reviewed_by = self.update.user
+            unit.change.reviewed_on = timestamp
+        return unit.change
+
+    def set_unit_ids(self, units):
+        """Databases that cant return ids from bulk inserts need to
+        look them up
+        """
+        unitid_hashes = [unit.unitid_hash for unit in units]
+        unit_ids = dict(
+            self.store.unit_set.filter(unitid_hash__in=unitid_hashes)
+                               .values_list("unitid_hash", "id"))
+        for unit in units:
+            unit.id = unit_ids[unit.unitid_hash]
+
+    @transaction.atomic
+    def add_chunk(self, to_add):
+        units = [
+            self.build_unit(unit, index)
+            for unit, index
+            in to_add]
+        self.unit_model.objects.bulk_create(units)
+        if units[0].id is None:
+            self.set_unit_ids(units)
+        UnitSource.objects.bulk_create(
+            [self.build_unit_source(unit)
+             for unit
+             in units])
+        UnitChange.objects.bulk_create(
+            [self.build_unit_change(unit)
+             for unit
+             in units
+             if unit.updated])
+        return units
+
+    def get_deltas(self, units):
+        deltas = {}
+        for unit in units:
+            deltas = add_wordcount_deltas(
+                deltas,
+                get_wordcount_deltas(
+                    new_state=unit.state,
+                    new_wordcount=unit.unit_source.source_wordcount))
+        return deltas
+
+    def post_add(self, units):
+        changed = [unit for unit in units if unit.updated]
+        to_check = [
+            unit.id
+            for unit
+            in changed
+            if unit.state != UNTRANSLATED]
+        if to_check:
+            update_checks.send(
+                self.unit_model,
+                units=to_check)
+        for unit in changed:
+            if unit.istranslated():
+                unit.update_tmserver()
+        mtimes = [unit.mtime for unit in units if unit.mtime]
+        update_data.send(
+            self.store.__class__,
+            instance=self.store,
+            deltas=self.get_deltas(units),
+            fields=["last_created_unit"],
+            max_unit_revision=self.update.update_revision,
+            max_unit_mtime=max(mtimes) if mtimes else None)
+
+    def add(self, to_add):
+        """Add units to the store
+
+        :param to_add: list of ``(unit, index)`` tuples
+        :return: The number of units added.
+        """
+        for i in range(0, len(to_add), self.chunk_size):
+            self.post_add(
+                self.add_chunk(to_add[i:i + self.chunk_size]))
+        return len(to_add)
+
+
 class StoreUpdater(object):
 
     unit_updater_class = UnitUpdater
+    unit_adder_class = BulkUnitAdder
+
+    # minimum number of new units before switching to bulk inserts
+    bulk_add_threshold = 50
+    submission_batch_size = 500
+    # max ids to filter by in a query
+    id_chunk_size = 200
 
     def __init__(self, target_store):
         self.target_store = target_store
@@ -307,6 +462,11 @@ class StoreUpdater(object):
             **filter_by).update(
                 revision=Revision.incr())
 
+    def iter_id_chunks(self, ids):
+        ids = list(ids)
+        for i in range(0, len(ids), self.id_chunk_size):
+            yield ids[i:i + self.id_chunk_size]
+
     def units(self, uids):
         unit_set = self.target_store.unit_set.select_related(
             "change", "change__submitted_by")
@@ -353,31 +513,128 @@ class StoreUpdater(object):
                     (self.target_store.data.max_unit_revision or 0))
         return update_revision, changes
 
+    def add_units(self, to_add, update):
+        """Adds new units to the target store.
+
+        Large numbers of units are added with bulk inserts.
+
+        :param to_add: list of ``(unit, index)`` tuples to add.
+        :return: The number of units added.
+        """
+        if len(to_add) >= self.bulk_add_threshold:
+            return self.unit_adder_class(update).add(to_add)
+        for unit, new_unit_index in to_add:
+            self.target_store.addunit(
+                unit,
+                new_unit_index,
+                user=update.user,
+                changed_with=update.submission_type,
+                update_revision=update.update_revision)
+        return len(to_add)
+
+    def get_units_to_obsolete(self, uids_to_obsolete, update):
+        """Returns a dictionary of ``id: (state, source_wordcount)`` for
+        units that should be made obsolete.
+
+        Units that have been added since the last sync, or that have been
+        updated since the last sync where Xtle wins, are kept.
+        """
+        store_revision = update.store_revision or 0
+        units = self.target_store.unit_set.exclude(state=OBSOLETE)
+        units = units.exclude(
+            unit_source__creation_revision__gt=store_revision)
+        if update.resolve_conflict == XTLE_WINS:
+            units = units.exclude(revision__gt=store_revision)
+        to_obsolete = {}
+        for ids in self.iter_id_chunks(uids_to_obsolete):
+            to_obsolete.update(
+                (unit_id, (state, wordcount or 0))
+                for unit_id, state, wordcount
+                in units.filter(id__in=ids).values_list(
+                    "id", "state", "unit_source__source_wordcount"))
+        return to_obsolete
+
+    def create_obsolete_submissions(self, units, update, timestamp):
+        Submission.objects.bulk_create(
+            [Submission(
+                translation_project_id=(
+                    self.target_store.translation_project_id),
+                unit_id=unit_id,
+                revision=update.update_revision,
+                creation_time=timestamp,
+                submitter=update.user,
+                field=SubmissionFields.STATE,
+                type=SubmissionTypes.SYSTEM,
+                old_value=state,
+                new_value=OBSOLETE)
+             for unit_id, (state, _wordcount)
+             in units.items()],
+            batch_size=self.submission_batch_size)
+        update_scores.send(
+            self.target_store.__class__,
+            instance=self.target_store,
+            users=[update.user.id],
+            date=localdate(timestamp))
+
+    def update_obsolete_changes(self, units, update, timestamp):
+        changed = set()
+        for ids in self.iter_id_chunks(units.keys()):
+            changes = UnitChange.objects.filter(unit_id__in=ids)
+            changed.update(changes.values_list("unit_id", flat=True))
+            changes.update(
+                changed_with=SubmissionTypes.SYSTEM,
+                reviewed_by=update.user,
+                reviewed_on=timestamp)
+        UnitChange.objects.bulk_create(
+            [UnitChange(
+                unit_id=unit_id,
+                changed_with=SubmissionTypes.SYSTEM,
+                reviewed_by=update.user,
+                reviewed_on=timestamp)
+             for unit_id
+             in units.keys()
+             if unit_id not in changed],
+            batch_size=self.submission_batch_size)
+
+    @transaction.atomic
     def mark_units_obsolete(self, uids_to_obsolete, update):
         """Marks a bulk of units as obsolete.
 
         :param uids_to_obsolete: UIDs of the units to be marked as obsolete.
         :return: The number of units marked as obsolete.
         """
-        obsoleted = 0
-        old_store = update.last_sync_store
-        for unit in self.target_store.findid_bulk(uids_to_obsolete):
-            # Use the same (parent) object since units will
-            # accumulate the list of cache attributes to clear
-            # in the parent Store object
-            added_since_sync = not bool(old_store.findid(unit.getid()))
-            xtle_wins = (
-                (unit.revision > update.store_revision or 0)
-                and update.resolve_conflict == XTLE_WINS)
-            if added_since_sync or xtle_wins:
-                continue
-            unit.store = self.target_store
-            if not unit.isobsolete():
-                unit.makeobsolete()
-                unit.revision = update.update_revision
-                unit.save(user=update.user)
-                obsoleted += 1
-        return obsoleted
+        if not uids_to_obsolete:
+            return 0
+        units = self.get_units_to_obsolete(uids_to_obsolete, update)
+        if not units:
+            return 0
+        timestamp = make_aware(timezone.now())
+        for ids in self.iter_id_chunks(units.keys()):
+            self.target_store.unit_set.filter(id__in=ids).update(
+                state=OBSOLETE,
+                index=0,
+                revision=update.update_revision,
+                content_hash=None,
+                mtime=timestamp)
+        self.update_obsolete_changes(units, update, timestamp)
+        self.create_obsolete_submissions(units, update, timestamp)
+        deltas = {}
+        for state, wordcount in units.values():
+            deltas = add_wordcount_deltas(
+                deltas,
+                get_wordcount_deltas(
+                    old_state=state,
+                    old_wordcount=wordcount,
+                    new_state=OBSOLETE,
+                    new_wordcount=wordcount))
+        update_data.send(
+            self.target_store.__class__,
+            instance=self.target_store,
+            deltas=deltas,
+            fields=list(LIVE_UNIT_DATA_FIELDS) + ["last_submission"],
+            max_unit_revision=update.update_revision,
+            max_unit_mtime=timestamp)
+        return len(units)
 
     def update_from_diff(self, store, store_revision,
                          to_change, update_revision, user,
@@ -403,20 +660,17 @@ class StoreUpdater(object):
                 in to_change["obsolete"]
                 if x not in to_change["update"][0]]
 
+        if update.uids:
+            # load the store at the last sync before any units are changed
+            update.last_sync_store
+
         if allow_add_and_obsolete:
             # Update indexes
             for start, delta in to_change["index"]:
                 self.target_store.update_index(start=start, delta=delta)
 
             # Add new units
-            for unit, new_unit_index in to_change["add"]:
-                self.target_store.addunit(
-                    unit,
-                    new_unit_index,
-                    user=user,
-                    changed_with=submission_type,
-                    update_revision=update_revision)
-            changes["added"] = len(to_change["add"])
+            changes["added"] = self.add_units(to_change["add"], update)
 
             # Obsolete units
             changes["obsoleted"] = self.mark_units_obsolete(
@@ -6,9 +6,16 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from hashlib import md5
+
 from django.conf import settings
+from django.utils.encoding import force_bytes
+
+from xtle.core.utils import dateformat
 
-from .constants import STATES_NAMES, TRANSLATED
+from .constants import FUZZY, OBSOLETE, STATES_NAMES, TRANSLATED
+from .fields import to_db as multistring_to_db
+from .fields import to_python as multistring_to_python
 from .unit.altsrc import AltSrcUnits
 
 
@@ -60,3 +67,88 @@ def get_state_name(code, default="untranslated"):
 
 def vfolders_installed():
     return "virtualfolder" in settings.INSTALLED_APPS
+
+
+def get_unit_fingerprint(context=None, developer_comment=None, locations=None,
+                         source=None, state=None, target=None,
+                         translator_comment=None):
+    """Returns a hash of the unit fields that are compared when diffing
+    stores.
+
+    Empty values are normalized so that DB and file units with matching
+    content have matching fingerprints.
+    """
+    values = (
+        context or "",
+        developer_comment or "",
+        locations or "",
+        multistring_to_db(multistring_to_python(source)),
+        str(state),
+        multistring_to_db(multistring_to_python(target)),
+        translator_comment or "")
+    return md5(force_bytes("\x00".join(values))).hexdigest()
+
+
+WORDCOUNT_FIELDS = ("total_words", "translated_words", "fuzzy_words")
+
+
+def get_wordcount_deltas(old_state=None, old_wordcount=0, new_state=None,
+                         new_wordcount=0):
+    """Returns the changes to a store's word counts when a unit moves from
+    one state and source wordcount to another.
+
+    Pass `None` as the state for units that are being created or deleted.
+    """
+    deltas = dict.fromkeys(WORDCOUNT_FIELDS, 0)
+    changes = (
+        (old_state, old_wordcount, -1),
+        (new_state, new_wordcount, 1))
+    for state, wordcount, sign in changes:
+        if state is None or not wordcount or wordcount < 0:
+            continue
+        if state > OBSOLETE:
+            deltas["total_words"] += sign * wordcount
+        if state == TRANSLATED:
+            deltas["translated_words"] += sign * wordcount
+        elif state == FUZZY:
+            deltas["fuzzy_words"] += sign * wordcount
+    return deltas
+
+
+# store data fields, other than word counts, that change when units are
+# added, made obsolete or resurrected
+LIVE_UNIT_DATA_FIELDS = (
+    "checks",
+    "critical_checks",
+    "last_created_unit",
+    "pending_suggestions")
+
+
+def add_wordcount_deltas(deltas, other):
+    return {
+        k: deltas.get(k, 0) + other.get(k, 0)
+        for k in WORDCOUNT_FIELDS}
+
+
+def get_tm_document(unit_id, revision, project, path, source, target,
+                    submitted_on=None, username="", fullname="", email=""):
+    """Returns the TM server document for a translated unit"""
+    doc = {
+        'id': unit_id,
+        # 'revision' must be an integer for statistical queries to work
+        'revision': revision,
+        'project': project,
+        'path': path,
+        'source': source,
+        'target': target,
+        'username': username or '',
+        'fullname': fullname or '',
+        'email_md5': (
+            md5(force_bytes(email)).hexdigest()
+            if username
+            else '')}
+    if submitted_on:
+        doc.update({
+            'iso_submitted_on': submitted_on.isoformat(),
+            'display_submitted_on': dateformat.format(submitted_on)})
+    return doc
@@ -1,14 +1,111 @@
+from django.utils.functional import cached_property
 
 from xtle.core.proxy import BaseProxy
 from xtle.statistics.models import Submission, SubmissionFields
 
+from .constants import FUZZY, OBSOLETE
+from .fields import to_python as multistring_to_python
+from .snapshots import snapshots
+
 
 class StoreVersion(BaseProxy):
     pass
 
 
+class VersionedUnit(object):
+    """The state of a unit at a past revision
+
+    Behaves like the translation toolkit unit that serializing the store at
+    that revision would give, for the parts that are compared when updating.
+    """
+
+    __slots__ = (
+        "unitid", "target", "translator_comment", "fuzzy", "obsolete",
+        "target_reverted", "state_reverted")
+
+    def __init__(self, unitid, target, state, translator_comment):
+        self.unitid = unitid
+        self.target = target
+        self.translator_comment = translator_comment
+        self.fuzzy = state == FUZZY
+        self.obsolete = state == OBSOLETE
+        self.target_reverted = False
+        self.state_reverted = None
+
+    def getid(self):
+        return self.unitid
+
+    def getnotes(self, origin=None):
+        if origin in (None, "translator"):
+            return self.translator_comment or ''
+        return ''
+
+    def isfuzzy(self):
+        return self.fuzzy
+
+    def markfuzzy(self, value=True):
+        self.fuzzy = value
+
+    def isobsolete(self):
+        return self.obsolete
+
+    def makeobsolete(self):
+        self.obsolete = True
+
+    def resurrect(self):
+        self.obsolete = False
+
+    def istranslated(self):
+        return bool(self.target) and not self.fuzzy and not self.obsolete
+
+
+class StoreAtRevision(object):
+    """The units of a store at a past revision, indexed by unitid
+
+    A translation toolkit store is only built if ``store`` is used.
+    """
+
+    def __init__(self, versioned, revision, units, replayed=True):
+        self.versioned = versioned
+        self.revision = revision
+        self.id_index = units
+        self.replayed = replayed
+
+    def findid(self, uid):
+        return self.id_index.get(uid)
+
+    @property
+    def units(self):
+        return list(self.id_index.values())
+
+    @cached_property
+    def store(self):
+        if not self.replayed:
+            # units from a snapshot only have hashes of their texts
+            return self.versioned.replay(self.revision).store
+        store = self.versioned.current_store
+        store.units = [
+            unit
+            for unit
+            in store.units
+            if unit.getid() in self.id_index]
+        for uid in list(store.id_index):
+            if uid not in self.id_index:
+                del store.id_index[uid]
+        for unit in store.units:
+            version = self.id_index[unit.getid()]
+            if version.target_reverted:
+                unit.target = version.target
+            if version.state_reverted:
+                self.versioned._revert_state(unit, *version.state_reverted)
+        return store
+
+
 class VersionedStore(object):
     version_class = StoreVersion
+    unit_class = VersionedUnit
+    at_revision_class = StoreAtRevision
+    snapshots = snapshots
 
     def __init__(self, store):
         self.store = store
@@ -21,43 +118,80 @@ class VersionedStore(object):
                     include_obsolete=True,
                     raw=True)))
 
-    def _revert_state(self, unit, sub):
-        if sub.old_value == "50":
+    def _revert_state(self, unit, old_value, new_value):
+        if old_value == "50":
             unit.markfuzzy()
-        if sub.old_value == "-100":
+        if old_value == "-100":
             unit.makeobsolete()
-        if sub.old_value in ["0", "200"]:
-            if sub.new_value == "50":
+        if old_value in ["0", "200"]:
+            if new_value == "50":
                 unit.markfuzzy(False)
-            if sub.new_value == "-100":
+            if new_value == "-100":
                 unit.resurrect()
 
-    def at_revision(self, revision):
-        store = self.current_store
-        subs = Submission.objects.filter(
-            unit__store=self.store).filter(
-                revision__gt=revision).order_by(
-                    "revision", "creation_time")
-        checking = dict(target=[], state=[])
-        unit_creation = self.store.unit_set.filter(
+    def get_units(self, revision):
+        """Returns ``pk: VersionedUnit`` for the current state of units that
+        existed at ``revision``
+        """
+        units = self.store.unit_set.exclude(
             unit_source__creation_revision__gt=revision).values_list(
-                "unitid", flat=True)
-        for unit in unit_creation:
-            del store.units[store.units.index(store.findid(unit))]
-            del store.id_index[unit]
-
-        for sub in subs.iterator():
-            unit = store.findid(sub.unit.getid())
-            if not unit:
+                "pk", "unitid", "target_f", "state", "translator_comment")
+        return {
+            pk: self.unit_class(unitid, target, state, translator_comment)
+            for pk, unitid, target, state, translator_comment
+            in units.iterator()}
+
+    def get_submissions(self, revision):
+        return Submission.objects.filter(
+            unit__store=self.store,
+            revision__gt=revision,
+            field__in=[SubmissionFields.TARGET, SubmissionFields.STATE]
+        ).order_by("revision", "creation_time").values_list(
+            "unit_id", "field", "old_value", "new_value")
+
+    def at_revision(self, revision):
+        units = self.snapshots.get(self.store, revision, self.unit_class)
+        if units is not None:
+            return self.at_revision_class(
+                self, revision, units, replayed=False)
+        return self.replay(revision)
+
+    def save_snapshot(self, revision):
+        """Saves a snapshot of the store at ``revision``, which must be the
+        revision the store was just synced at
+
+        The current units are used as they are, so nothing is saved if
+        units have changed since.
+        """
+        if self.snapshots.get_revision(self.store) == revision:
+            return
+        if self.store.unit_set.filter(revision__gt=revision).exists():
+            return
+        self.snapshots.set(
+            self.store,
+            revision,
+            self.get_units(revision).values())
+
+    def replay(self, revision):
+        """Rebuilds the store at ``revision`` by reverting the changes
+        made since
+        """
+        units = self.get_units(revision)
+        # only the earliest change to each field after revision is reverted
+        reverted = set()
+        submissions = self.get_submissions(revision)
+        for unit_id, field, old_value, new_value in submissions.iterator():
+            if (unit_id, field) in reverted or unit_id not in units:
                 continue
-            if sub.field == SubmissionFields.TARGET:
-                if sub.unit.pk in checking["target"]:
-                    continue
-                checking["target"].append(sub.unit.pk)
-                unit.target = sub.old_value
-            if sub.field == SubmissionFields.STATE:
-                if sub.unit.pk in checking["state"]:
-                    continue
-                checking["state"].append(sub.unit.pk)
-                self._revert_state(unit, sub)
-        return store
+            reverted.add((unit_id, field))
+            unit = units[unit_id]
+            if field == SubmissionFields.TARGET:
+                unit.target = multistring_to_python(old_value)
+                unit.target_reverted = True
+            else:
+                unit.state_reverted = (old_value, new_value)
+                self._revert_state(unit, old_value, new_value)
+        return self.at_revision_class(
+            self,
+            revision,
+            {unit.unitid: unit for unit in units.values()})
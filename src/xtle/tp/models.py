@@ -19,7 +19,7 @@ from xtle.core.delegate import data_tool
 from xtle.core.mixins import CachedTreeItem
 from xtle.core.url_helpers import get_editor_filter, split_xtle_path
 from xtle.app.models.directory import Directory
-from xtle.checks.constants import EXCLUDED_FILTERS
+from xtle.checks.checkers import checkers
 from xtle.project.models import Project
 from xtle.revision.models import Revision
 from xtle.staticpages.models import StaticPage
@@ -150,15 +150,9 @@ class TranslationProject(models.Model, CachedTreeItem):
 
     @property
     def checker(self):
-        from translate.filters import checks
-        checkerclasses = [
-            checks.projectcheckers.get(
-                self.project.checkstyle,
-                checks.StandardChecker)]
-        return checks.TeeChecker(checkerclasses=checkerclasses,
-                                 excludefilters=EXCLUDED_FILTERS,
-                                 errorhandler=self.filtererrorhandler,
-                                 languagecode=self.language.code)
+        return checkers.get(
+            self.project.checkstyle,
+            self.language.code)
 
     @property
     def disabled(self):
@@ -210,14 +204,6 @@ class TranslationProject(models.Model, CachedTreeItem):
         """Return the related announcement, if any."""
         return StaticPage.get_announcement_for(self.xtle_path, user)
 
-    def filtererrorhandler(self, functionname, str1, str2, e):
-        logger.error(
-            u"Error in filter %s: %r, %r, %s",
-            functionname,
-            str1,
-            str2, e)
-        return False
-
     def is_accessible_by(self, user):
         """Returns `True` if the current translation project is accessible
         by `user`.